@@ -0,0 +1,37 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+
+# 프로필 이미지 URL
+# User.avatar_url에 미리 계산해 두고 (소셜 계정 이미지 > gravatar)
+# 소셜 계정이 연결/갱신/삭제되거나 email이 바뀔 때 다시 계산한다. (accounts/signals.py)
+# 템플릿에서는 avatar_url만 읽으므로 쿼리가 없다.
+# 목록은 사용자를 .only(..., 'avatar_url')로 join해서 읽는다. (accounts/follows.py)
+
+GRAVATAR_URL = 'https://www.gravatar.com/avatar/'
+
+
+def gravatar_url(email):
+    return GRAVATAR_URL + hashlib.md5((email or '').strip().lower().encode('utf-8')).hexdigest()
+
+
+def social_avatar_url(social_account):
+    # kakao : extra_data['properties']['profile_image']
+    properties = (social_account.extra_data or {}).get('properties') or {}
+    return properties.get('profile_image') or ''
+
+
+def resolve_avatar(email, social_accounts):
+    for social_account in social_accounts:
+        url = social_avatar_url(social_account)
+        if url:
+            return url
+    return gravatar_url(email)
+
+
+def refresh_avatar(user):
+    """소셜 계정을 읽어서 avatar_url을 다시 계산하고 저장한다."""
+    user.avatar_url = resolve_avatar(user.email, user.socialaccount_set.order_by('pk'))
+    get_user_model().objects.filter(pk=user.pk).update(avatar_url=user.avatar_url)
+    return user.avatar_url
+
@@ -0,0 +1,12 @@
+from crud.counters import count_subquery
+from django.db.models import OuterRef
+
+
+def recount_follows(User):
+    """follower_count, following_count를 실제 row 수로 다시 계산한다."""
+    # followers through table : from_user = 팔로우 당한 사람, to_user = 팔로워
+    Follow = User.followers.through
+    return User.objects.update(
+        follower_count=count_subquery(Follow.objects.filter(from_user_id=OuterRef('pk')), 'from_user_id'),
+        following_count=count_subquery(Follow.objects.filter(to_user_id=OuterRef('pk')), 'to_user_id'),
+    )
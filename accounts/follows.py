@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+
+from articles.pagination import paginate
+
+# 팔로우 관계 (User.followers through table)
+# followers through table : from_user = 팔로우 당한 사람, to_user = 팔로워
+# - (from_user_id, to_user_id) unique index : 팔로워 목록, 팔로우 여부 확인
+# - (to_user_id, from_user_id) index : 팔로잉 목록 (migration 0005)
+# 추가/삭제는 m2m add/remove로 해서 카운터와 timeline signal이 그대로 동작한다.
+
+# avatar_url이 비어 있으면 makehash가 email을 사용한다.
+USER_FIELDS = ('id', 'username', 'email', 'avatar_url')
+
+
+def _follow():
+    return get_user_model().followers.through
+
+
+def is_following(follower_id, author_id):
+    # 팔로워 목록 전체를 읽지 않고 unique index로 row 하나만 확인
+    return _follow().objects.filter(from_user_id=author_id, to_user_id=follower_id).exists()
+
+
+def toggle_follow(author, follower):
+    """팔로우 토글. 팔로우 상태가 되었으면 True를 돌려준다."""
+    with transaction.atomic():
+        if is_following(follower.pk, author.pk):
+            author.followers.remove(follower)
+            return False
+        author.followers.add(follower)
+        return True
+
+
+def _targets(follower, author_ids):
+    # 존재하는 사용자만, 본인은 제외
+    User = get_user_model()
+    return list(User.objects.filter(pk__in=set(author_ids)).exclude(pk=follower.pk).values_list('pk', flat=True))
+
+
+def follow_many(follower, author_ids, batch_size=None):
+    """author_ids를 한꺼번에 팔로우한다. (연락처 가져오기 등)
+
+    batch마다 정해진 수의 쿼리로 처리하고 (팔로우 INSERT, 카운터 UPDATE, timeline INSERT ... SELECT 등)
+    이미 팔로우한 사용자는 건너뛴다.
+    """
+    batch_size = batch_size or settings.FOLLOW_BATCH_SIZE
+    targets = _targets(follower, author_ids)
+    for start in range(0, len(targets), batch_size):
+        with transaction.atomic():
+            follower.followings.add(*targets[start:start + batch_size])
+
+
+def unfollow_many(follower, author_ids, batch_size=None):
+    batch_size = batch_size or settings.FOLLOW_BATCH_SIZE
+    targets = _targets(follower, author_ids)
+    for start in range(0, len(targets), batch_size):
+        with transaction.atomic():
+            follower.followings.remove(*targets[start:start + batch_size])
+
+
+def _page(queryset, user_field, cursor):
+    # 상대방 id 순서로 keyset 페이지네이션, 사용자 정보는 join
+    entries, next_cursor = paginate(
+        queryset.select_related(user_field).only(
+            user_field, *(f'{user_field}__{field}' for field in USER_FIELDS),
+        ),
+        cursor,
+        page_size=settings.FOLLOW_PAGE_SIZE,
+        key=f'{user_field}_id',
+    )
+    return [getattr(entry, user_field) for entry in entries], next_cursor
+
+
+def followers(user_id, cursor=None):
+    return _page(_follow().objects.filter(from_user_id=user_id), 'to_user', cursor)
+
+
+def followings(user_id, cursor=None):
+    return _page(_follow().objects.filter(to_user_id=user_id), 'from_user', cursor)
+
+
+def mutuals(user_id, cursor=None):
+    # 내가 팔로우한 사람 중 나를 팔로우한 사람 : 팔로잉 한 명마다 unique index 한 번 확인
+    Follow = _follow()
+    follows_back = Follow.objects.filter(from_user_id=user_id, to_user_id=OuterRef('from_user_id'))
+    return _page(
+        Follow.objects.filter(to_user_id=user_id).annotate(follows_back=Exists(follows_back)).filter(follows_back=True),
+        'from_user', cursor,
+    )
+
+
+def suggestions(user, limit=None):
+    """팔로우할 만한 사용자 : 내가 팔로우한 사람들이 많이 팔로우한 사람 순서
+
+    팔로잉 중 FOLLOW_SUGGESTION_SAMPLE명만 보므로 팔로잉이 많아도 비용이 일정하다.
+    후보가 부족하면 팔로워가 많은 사용자로 채운다.
+    """
+    limit = limit or settings.FOLLOW_SUGGESTIONS_SIZE
+    User = get_user_model()
+    Follow = _follow()
+    sample = Follow.objects.filter(to_user_id=user.pk).order_by('-from_user_id').values('from_user_id')[:settings.FOLLOW_SUGGESTION_SAMPLE]
+    already = Follow.objects.filter(from_user_id=OuterRef('from_user_id'), to_user_id=user.pk)
+    ids = list(
+        Follow.objects.filter(to_user_id__in=sample).exclude(from_user_id=user.pk)
+        .annotate(already=Exists(already)).filter(already=False)
+        .values('from_user_id').annotate(score=Count('*')).order_by('-score', '-from_user_id')
+        .values_list('from_user_id', flat=True)[:limit]
+    )
+    if len(ids) < limit:
+        already = Follow.objects.filter(from_user_id=OuterRef('pk'), to_user_id=user.pk)
+        ids += User.objects.exclude(pk__in=ids + [user.pk]).annotate(already=Exists(already)).filter(
+            already=False,
+        ).order_by('-follower_count').values_list('pk', flat=True)[:limit - len(ids)]
+    users = User.objects.only(*USER_FIELDS).in_bulk(ids)
+    return [users[pk] for pk in ids if pk in users]
@@ -0,0 +1,91 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts import follows
+from articles.management.commands.seed import batches, zipf_weights
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = '팔로워가 일부 사용자에게 몰린 그래프에서 팔로우 관련 연산 비용을 측정한다. (모든 데이터는 rollback)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--follows', type=int, default=30, help='사용자당 팔로우 수')
+        parser.add_argument('--exponent', type=float, default=1.1, help='인기 편중 정도 (zipf 지수)')
+        parser.add_argument('--bulk', type=int, default=500, help='한 번에 팔로우할 사용자 수')
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def build(self, options):
+        User = get_user_model()
+        Follow = User.followers.through
+        User.objects.bulk_create([User(username=f'bench-follow-{i}') for i in range(options['users'])])
+        user_ids = list(User.objects.filter(username__startswith='bench-follow-').order_by('pk').values_list('pk', flat=True))
+        rng = random.Random(0)
+        weights = zipf_weights(len(user_ids), options['exponent'])
+
+        def edges():
+            for follower_id in user_ids:
+                for author_id in set(rng.choices(user_ids, cum_weights=weights, k=options['follows'])) - {follower_id}:
+                    yield Follow(from_user_id=author_id, to_user_id=follower_id)
+
+        for batch in batches(edges(), 5000):
+            Follow.objects.bulk_create(batch, ignore_conflicts=True)
+        return user_ids
+
+    def measure(self, label, function, repeat):
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                function()
+                timings.append(time.perf_counter() - started)
+        self.stdout.write('{:<28} {:>10.3f} {:>8.1f}'.format(
+            label, statistics.median(timings) * 1000, len(queries) / repeat,
+        ))
+
+    def run(self, options):
+        User = get_user_model()
+        user_ids = self.build(options)
+        # 팔로워가 가장 많은 사용자와 마지막(팔로워가 가장 적은) 사용자
+        celebrity = User.objects.get(pk=user_ids[0])
+        follower = User.objects.get(pk=user_ids[-1])
+        fan_in = celebrity.followers.count()
+        self.stdout.write(f'users {len(user_ids)}, celebrity followers {fan_in}')
+        self.stdout.write(f"{'operation':<28} {'ms':>10} {'queries':>8}")
+
+        repeat = options['repeat']
+        self.measure('is_following', lambda: follows.is_following(follower.pk, celebrity.pk), repeat)
+        # 기존 방식 : request.user in obama.followers.all()
+        self.measure('is_following (legacy)', lambda: follower in celebrity.followers.all(), max(1, repeat // 10))
+        self.measure('followers page', lambda: follows.followers(celebrity.pk), repeat)
+        self.measure('followings page', lambda: follows.followings(follower.pk), repeat)
+        self.measure('mutuals page', lambda: follows.mutuals(follower.pk), repeat)
+        self.measure('suggestions', lambda: follows.suggestions(follower), repeat)
+
+        # 팔로우하지 않은 사용자 중 bulk명 : 한 번에 vs 한 명씩
+        targets = list(
+            User.objects.filter(username__startswith='bench-follow-').exclude(pk=follower.pk)
+            .exclude(pk__in=follower.followings.values('pk')).order_by('pk').values_list('pk', flat=True)[:options['bulk'] * 2]
+        )
+        single, bulk = targets[:options['bulk']], targets[options['bulk']:]
+        self.measure(f'follow one by one ({len(single)})', lambda: [follows.toggle_follow(User(pk=pk), follower) for pk in single], 1)
+        self.measure(f'follow_many ({len(bulk)})', lambda: follows.follow_many(follower, bulk), 1)
+        self.measure(f'unfollow_many ({len(bulk)})', lambda: follows.unfollow_many(follower, bulk), 1)
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:14
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset, group_field):
+    counts = queryset.order_by().values(group_field).annotate(count=Count('*')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def recount(apps, schema_editor):
+    # followers through table : from_user = 팔로우 당한 사람, to_user = 팔로워
+    User = apps.get_model('accounts', 'User')
+    Follow = User.followers.through
+    User.objects.update(
+        follower_count=count_subquery(Follow.objects.filter(from_user_id=OuterRef('pk')), 'from_user_id'),
+        following_count=count_subquery(Follow.objects.filter(to_user_id=OuterRef('pk')), 'to_user_id'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_followers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recount, migrations.RunPython.noop),
+    ]
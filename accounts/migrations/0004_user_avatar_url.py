@@ -0,0 +1,46 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:43
+
+import hashlib
+
+from django.db import migrations, models
+
+# accounts.avatars를 import하지 않도록 마이그레이션 시점의 규칙을 그대로 둔다.
+GRAVATAR_URL = 'https://www.gravatar.com/avatar/'
+
+
+def resolve_avatar(email, social_accounts):
+    # 소셜 계정 이미지(kakao properties.profile_image) > gravatar
+    for social_account in social_accounts:
+        properties = (social_account.extra_data or {}).get('properties') or {}
+        if properties.get('profile_image'):
+            return properties['profile_image']
+    return GRAVATAR_URL + hashlib.md5((email or '').strip().lower().encode('utf-8')).hexdigest()
+
+
+def fill_avatar_urls(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    SocialAccount = apps.get_model('socialaccount', 'SocialAccount')
+    social_accounts = {}
+    for social_account in SocialAccount.objects.order_by('pk'):
+        social_accounts.setdefault(social_account.user_id, []).append(social_account)
+    users = list(User.objects.only('pk', 'email'))
+    for user in users:
+        user.avatar_url = resolve_avatar(user.email, social_accounts.get(user.pk, ()))
+    User.objects.bulk_update(users, ['avatar_url'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_counters'),
+        ('socialaccount', '0003_extra_data_default_dict'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_url',
+            field=models.URLField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.RunPython(fill_avatar_urls, migrations.RunPython.noop),
+    ]
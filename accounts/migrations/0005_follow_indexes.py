@@ -0,0 +1,24 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_avatar_url'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-follower_count'], name='user_follower_count_idx'),
+        ),
+        # 팔로잉 목록 : to_user(팔로워)로 거르고 from_user_id 순서로 keyset 페이지네이션
+        # (자동 생성 through table이라 Meta.indexes 대신 SQL로 추가)
+        migrations.RunSQL(
+            'CREATE INDEX accounts_user_followers_follower_idx '
+            'ON accounts_user_followers (to_user_id, from_user_id)',
+            'DROP INDEX accounts_user_followers_follower_idx',
+        ),
+    ]
@@ -1,6 +1,20 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
+
+from crud.counters import CounterFieldsMixin
 # Create your models here.
-class User(AbstractUser):  # 확장 가능성을 위해 직접 만들어서 사용 권장
-    followers = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='followings', blank=True)
\ No newline at end of file
+class User(CounterFieldsMixin, AbstractUser):  # 확장 가능성을 위해 직접 만들어서 사용 권장
+    followers = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='followings', blank=True)
+    # 역정규화 카운터 (accounts/signals.py에서 F()로 갱신)
+    follower_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+    counter_fields = ('follower_count', 'following_count')
+    # 프로필 이미지 URL : 소셜 계정 이미지 또는 gravatar (accounts/avatars.py)
+    avatar_url = models.URLField(max_length=500, blank=True, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # 팔로우 추천 : 팔로워가 많은 사용자 순서 (accounts/follows.py)
+            models.Index(fields=['-follower_count'], name='user_follower_count_idx'),
+        ]
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.db.models import BooleanField, Exists, OuterRef, Prefetch, Value
+from django.shortcuts import get_object_or_404
+
+from crud.counters import count_subquery
+from articles.models import Article, Comment
+
+
+def load_profile(account_pk, viewer):
+    """프로필 페이지에 필요한 데이터를 정해진 수의 쿼리로 읽는다.
+
+    - 글/댓글/좋아요 수 : annotate 서브쿼리
+    - 팔로우 여부, 상대방이 나를 팔로우하는지 : EXISTS
+    - 본인 프로필이면 글/댓글/좋아요 목록 : 필요한 컬럼만 prefetch (쿼리 3개)
+    """
+    User = get_user_model()
+    Follow = User.followers.through
+    Like = Article.like_users.through
+    if viewer.is_authenticated:
+        # followers through table : from_user = 팔로우 당한 사람, to_user = 팔로워
+        is_followed = Exists(Follow.objects.filter(from_user_id=OuterRef('pk'), to_user_id=viewer.pk))
+        follows_viewer = Exists(Follow.objects.filter(from_user_id=viewer.pk, to_user_id=OuterRef('pk')))
+    else:
+        is_followed = follows_viewer = Value(False, output_field=BooleanField())
+    users = User.objects.annotate(
+        article_count=count_subquery(Article.objects.filter(user_id=OuterRef('pk')), 'user_id'),
+        comment_count=count_subquery(Comment.objects.filter(user_id=OuterRef('pk')), 'user_id'),
+        like_article_count=count_subquery(Like.objects.filter(user_id=OuterRef('pk')), 'user_id'),
+        is_followed=is_followed,
+        follows_viewer=follows_viewer,
+    )
+    if viewer.pk == account_pk:
+        users = users.prefetch_related(
+            Prefetch('article_set', queryset=Article.objects.only('id', 'title', 'user_id').order_by('-id')),
+            Prefetch('comment_set', queryset=Comment.objects.only('id', 'content', 'article_id', 'user_id').order_by('-id')),
+            Prefetch('like_articles', queryset=Article.objects.only('id', 'title').order_by('-id')),
+        )
+    return get_object_or_404(users, pk=account_pk)
@@ -0,0 +1,66 @@
+from allauth.socialaccount.models import SocialAccount
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from crud.counters import adjust
+
+from . import avatars
+from .models import User
+
+
+@receiver(pre_save, sender=User)
+def update_gravatar(sender, instance, update_fields=None, **kwargs):
+    # 소셜 계정 이미지가 아니면 email로 gravatar URL을 다시 계산 (쿼리 없음)
+    if update_fields is not None and 'email' not in update_fields:
+        return
+    if not instance.avatar_url or instance.avatar_url.startswith(avatars.GRAVATAR_URL):
+        instance.avatar_url = avatars.gravatar_url(instance.email)
+
+
+@receiver(post_save, sender=SocialAccount)
+@receiver(post_delete, sender=SocialAccount)
+def refresh_social_avatar(sender, instance, **kwargs):
+    # allauth가 소셜 계정을 연결(가입 포함)하거나 로그인할 때 extra_data를 갱신하면서 저장한다.
+    avatars.refresh_avatar(instance.user)
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def count_follows(sender, instance, action, reverse, pk_set, **kwargs):
+    # obama.followers.add(me)  -> reverse=False, instance=obama, pk_set={me}
+    # me.followings.add(obama) -> reverse=True,  instance=me,    pk_set={obama}
+    Follow = sender
+    if action == 'pre_remove':
+        # remove()는 실제로 없는 pk도 그대로 넘겨주므로 존재하는 것만 남긴다.
+        if reverse:
+            existing = Follow.objects.filter(to_user_id=instance.pk, from_user_id__in=pk_set).values_list('from_user_id', flat=True)
+        else:
+            existing = Follow.objects.filter(from_user_id=instance.pk, to_user_id__in=pk_set).values_list('to_user_id', flat=True)
+        pk_set.intersection_update(existing)
+        return
+    if action == 'pre_clear':
+        if reverse:
+            adjust(User, list(instance.followings.values_list('pk', flat=True)), 'follower_count', -1)
+            User.objects.filter(pk=instance.pk).update(following_count=0)
+        else:
+            adjust(User, list(instance.followers.values_list('pk', flat=True)), 'following_count', -1)
+            User.objects.filter(pk=instance.pk).update(follower_count=0)
+        return
+    if action not in ('post_add', 'post_remove'):
+        return
+    delta = 1 if action == 'post_add' else -1
+    if reverse:
+        adjust(User, [instance.pk], 'following_count', delta * len(pk_set))
+        adjust(User, pk_set, 'follower_count', delta)
+    else:
+        adjust(User, [instance.pk], 'follower_count', delta * len(pk_set))
+        adjust(User, pk_set, 'following_count', delta)
+
+
+@receiver(pre_delete, sender=User)
+def uncount_deleted_user_follows(sender, instance, **kwargs):
+    # 사용자를 지우면 follow row는 CASCADE로 지워지고 m2m_changed가 오지 않으므로 미리 뺀다.
+    Follow = User.followers.through
+    followed = Follow.objects.filter(to_user_id=instance.pk).values_list('from_user_id', flat=True)
+    followers = Follow.objects.filter(from_user_id=instance.pk).values_list('to_user_id', flat=True)
+    adjust(User, list(followed), 'follower_count', -1)
+    adjust(User, list(followers), 'following_count', -1)
@@ -1,3 +1,149 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from articles.models import Article, Comment, TimelineEntry
+from crud.counters import adjust
+
+from . import follows
+from .models import User
+
 
 # Create your tests here.
+class ProfileQueryCountTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='pw')
+        self.viewer = User.objects.create_user('viewer', password='pw')
+        self.created = 0
+
+    def add_activity(self, n):
+        User.objects.bulk_create([User(username=f'user{self.created + i}') for i in range(n)])
+        self.created += n
+        for i in range(n):
+            article = Article.objects.create(title=f'글{i}', content=f'내용 #{i}', user=self.owner)
+            Comment.objects.create(content='댓글', article=article, user=self.owner)
+            article.like_users.add(self.owner)
+        self.owner.followers.add(*User.objects.filter(username__startswith='user'))
+
+    def count_queries(self, viewer):
+        self.client.force_login(viewer)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('accounts:profile', args=[self.owner.pk]))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_data(self):
+        self.add_activity(1)
+        small_own, small_other = self.count_queries(self.owner), self.count_queries(self.viewer)
+        self.add_activity(30)
+        self.assertEqual(self.count_queries(self.owner), small_own)
+        self.assertEqual(self.count_queries(self.viewer), small_other)
+
+    def test_counts_and_follow_state(self):
+        self.add_activity(3)
+        self.owner.followers.add(self.viewer)
+        self.client.force_login(self.viewer)
+        profile = self.client.get(reverse('accounts:profile', args=[self.owner.pk])).context['user_profile']
+        self.assertEqual(profile.article_count, 3)
+        self.assertEqual(profile.comment_count, 3)
+        self.assertEqual(profile.like_article_count, 3)
+        self.assertEqual(profile.follower_count, 4)
+        self.assertTrue(profile.is_followed)
+
+
+class CounterTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='pw')
+        self.fan = User.objects.create_user('fan', password='pw')
+        self.article = Article.objects.create(title='글', content='내용', user=self.author)
+        self.author.followers.add(self.fan)
+        self.article.like_users.add(self.fan)
+        Comment.objects.create(content='댓글', article=self.article, user=self.fan)
+
+    def test_full_save_keeps_counters(self):
+        stale = Article.objects.get(pk=self.article.pk)
+        self.article.like_users.add(self.author)
+        stale.title = '수정'
+        stale.save()
+        stale.refresh_from_db()
+        self.assertEqual((stale.title, stale.like_count, stale.comment_count), ('수정', 2, 1))
+
+    def test_deleting_user_updates_counters(self):
+        self.fan.followers.add(self.author)
+        self.fan.delete()
+        self.author.refresh_from_db()
+        self.article.refresh_from_db()
+        self.assertEqual((self.author.follower_count, self.author.following_count), (0, 0))
+        self.assertEqual((self.article.like_count, self.article.comment_count), (0, 0))
+
+    def test_decrement_stops_at_zero(self):
+        # 이미 어긋난 카운터를 더 줄여도 CHECK 제약 위반 없이 0에서 멈춘다.
+        User.objects.filter(pk=self.author.pk).update(follower_count=1)
+        adjust(User, [self.author.pk], 'follower_count', -3)
+        adjust(User, [self.author.pk], 'follower_count', -1)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.follower_count, 0)
+
+
+class FollowServiceTest(TestCase):
+    def setUp(self):
+        self.me = User.objects.create_user('me', password='pw')
+        self.users = [User.objects.create_user(f'user{i}', password='pw') for i in range(5)]
+
+    def counts(self, user):
+        user.refresh_from_db(fields=['follower_count', 'following_count'])
+        return user.follower_count, user.following_count
+
+    def test_is_following(self):
+        follows.toggle_follow(self.users[0], self.me)
+        self.assertTrue(follows.is_following(self.me.pk, self.users[0].pk))
+        self.assertFalse(follows.is_following(self.users[0].pk, self.me.pk))
+        follows.toggle_follow(self.users[0], self.me)
+        self.assertFalse(follows.is_following(self.me.pk, self.users[0].pk))
+
+    def test_follow_many_keeps_counters(self):
+        self.me.followings.add(self.users[0])
+        ids = [user.pk for user in self.users] + [self.me.pk, 0]
+        follows.follow_many(self.me, ids, batch_size=2)
+        self.assertEqual(self.counts(self.me), (0, 5))
+        self.assertEqual([self.counts(user) for user in self.users], [(1, 0)] * 5)
+
+        follows.unfollow_many(self.me, ids[:3] + [0], batch_size=2)
+        self.assertEqual(self.counts(self.me), (0, 2))
+        self.assertEqual([self.counts(user)[0] for user in self.users], [0, 0, 0, 1, 1])
+        # 팔로우하지 않은 사용자를 취소해도 카운터는 그대로
+        follows.unfollow_many(self.me, ids[:3])
+        self.assertEqual(self.counts(self.me), (0, 2))
+
+    def test_follow_many_query_count(self):
+        # 팔로우하는 사용자 수와 관계없이 batch마다 쿼리 수가 일정하다. (timeline backfill 포함)
+        User.objects.bulk_create([User(username=f'author{i}') for i in range(100)])
+        authors = list(User.objects.filter(username__startswith='author'))
+        Article.objects.bulk_create([Article(title='글', content='내용', user=author) for author in authors])
+
+        # 대상 확인, 기존 팔로우 확인, 팔로우 INSERT, 카운터 UPDATE 2번, timeline INSERT ... SELECT, savepoint 2번
+        for follower, targets in ((self.users[0], authors[:10]), (self.users[1], authors)):
+            with self.assertNumQueries(8):
+                follows.follow_many(follower, [author.pk for author in targets])
+        self.assertEqual(TimelineEntry.objects.filter(owner=self.users[1]).count(), 100)
+
+    def test_mutuals(self):
+        self.me.followings.add(*self.users[:3])
+        self.me.followers.add(self.users[1], self.users[2], self.users[4])
+        mutuals, next_cursor = follows.mutuals(self.me.pk)
+        self.assertEqual({user.pk for user in mutuals}, {self.users[1].pk, self.users[2].pk})
+        self.assertIsNone(next_cursor)
+
+    def test_suggestions(self):
+        # me -> user0, user1 / user0, user1 -> user2 / user1 -> user3 / user4는 팔로워가 가장 많다.
+        self.me.followings.add(self.users[0], self.users[1])
+        self.users[2].followers.add(self.users[0], self.users[1])
+        self.users[3].followers.add(self.users[1])
+        self.users[4].followers.add(self.users[2], self.users[3], self.users[0], self.users[1])
+        self.assertEqual(follows.suggestions(self.me, limit=2), [self.users[4], self.users[2]])
+        # 친구의 친구가 부족하면 팔로워가 많은 사용자로 채운다. (이미 팔로우한 사용자, 본인 제외)
+        suggested = follows.suggestions(self.me, limit=4)
+        self.assertEqual(len(suggested), 3)
+        self.assertNotIn(self.me, suggested)
+        self.assertNotIn(self.users[0], suggested)
@@ -9,4 +9,8 @@ urlpatterns = [
     path('password/', views.password_change, name='password_change'),
     path('<int:account_pk>/profile/', views.profile, name='profile'),
     path('<int:account_pk>/follow/', views.follow, name='follow'),
+    path('<int:account_pk>/followers/', views.follow_list, {'kind': 'followers'}, name='followers'),
+    path('<int:account_pk>/followings/', views.follow_list, {'kind': 'followings'}, name='followings'),
+    path('<int:account_pk>/mutuals/', views.follow_list, {'kind': 'mutuals'}, name='mutuals'),
+    path('follow/', views.follow_bulk, name='follow_bulk'),
 ]
@@ -2,10 +2,16 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm, UserChangeForm, PasswordChangeForm
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
+from django.http import JsonResponse
+from django.conf import settings
 from django.contrib.auth import login as auth_login  # login함수
 from django.contrib.auth import logout as auth_logout
 from .forms import CustomUserChangeForm, CustomUserCreationForm
 from .models import User
+from .profiles import load_profile
+from . import follows
+from crud.replicas import read_only
 from django.contrib.auth import get_user_model
 from IPython import embed
 # Create your views here.
@@ -74,12 +80,14 @@ def password_change(request):
         form = PasswordChangeForm(request.user)
     return render(request, 'accounts/password_change.html', {'form': form})
 
+@read_only
 def profile(request, account_pk):
-    User = get_user_model()
-    user = get_object_or_404(User, pk=account_pk)
+    user = load_profile(account_pk, request.user)
     context = {
         'user_profile' : user
     }
+    if request.user == user:
+        context['suggestions'] = follows.suggestions(request.user)
     from IPython import embed
     # embed()
     return render(request, 'accounts/profile.html', context)
@@ -90,16 +98,43 @@ def follow(request, account_pk):
     obama = get_object_or_404(User, pk=account_pk)
 
     if obama != request.user:
-        # obama를 팔로우한 적이 있다면
-        if request.user in obama.followers.all():
-            # 취소
-            obama.followers.remove(request.user)
-        # 아니면
-        else:
-            # 팔로우
-            obama.followers.add(request.user)
+        # 팔로우한 적이 있으면 취소, 아니면 팔로우 (팔로워 목록 전체를 읽지 않는다.)
+        follows.toggle_follow(obama, request.user)
 
     return redirect('accounts:profile', account_pk)
 
 
-    
\ No newline at end of file
+FOLLOW_LISTS = {
+    'followers': ('팔로워', follows.followers),
+    'followings': ('팔로잉', follows.followings),
+    'mutuals': ('맞팔로우', follows.mutuals),
+}
+
+
+@read_only
+def follow_list(request, account_pk, kind):
+    User = get_user_model()
+    user_profile = get_object_or_404(User.objects.only('id', 'username'), pk=account_pk)
+    title, load = FOLLOW_LISTS[kind]
+    users, next_cursor = load(user_profile.pk, request.GET.get('before'))
+    context = {
+        'user_profile': user_profile,
+        'title': title,
+        'users': users,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'accounts/follow.html', context)
+
+
+@require_POST
+@login_required
+def follow_bulk(request):
+    # 여러 사용자를 한 번에 팔로우/취소 (username 목록, 연락처 가져오기 등)
+    usernames = request.POST.getlist('usernames')[:settings.FOLLOW_BULK_LIMIT]
+    author_ids = get_user_model().objects.filter(username__in=usernames).values_list('pk', flat=True)
+    if request.POST.get('action') == 'unfollow':
+        follows.unfollow_many(request.user, author_ids)
+    else:
+        follows.follow_many(request.user, author_ids)
+    request.user.refresh_from_db(fields=['following_count'])
+    return JsonResponse({'following_count': request.user.following_count})
@@ -0,0 +1,358 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_http_methods
+
+from crud.replicas import read_only
+
+from . import likes, trending
+from .comments import comment_page, serialize_comment
+from .forms import ArticleForm, CommentForm
+from .models import Article, Comment, HashTag
+from .pagination import paginate
+from .uploadhandlers import stream_image_upload, upload_errors
+
+# JSON API (/api/)
+# - ?fields=id,title : 필요한 필드만 .only()로 읽고 응답에도 그 필드만 넣는다.
+# - 목록은 keyset 커서(?before=), 한 페이지 크기는 ?limit= (API_MAX_PAGE_SIZE까지)
+# - 글 상세는 ETag/Last-Modified로 조건부 GET : 바뀌지 않았으면 본문을 만들지 않고 304
+# - 응답은 gzip (Accept-Encoding에 따라)
+# 쓰기는 HTML view와 같은 form으로 검증하고 session 로그인 + CSRF token이 필요하다.
+# (PATCH는 JSON body만)
+
+# API 필드 -> (.only()에 넣을 컬럼, 값을 만드는 함수)
+ARTICLE_FIELDS = {
+    'id': (('id',), lambda article: article.id),
+    'title': (('title',), lambda article: article.title),
+    'content': (('content',), lambda article: article.content),
+    'content_html': (('content_html',), lambda article: article.content_html),
+    'image': (('image',), lambda article: article.image.url if article.image else None),
+    'created_at': (('created_at',), lambda article: article.created_at.isoformat()),
+    'updated_at': (('updated_at',), lambda article: article.updated_at.isoformat()),
+    'like_count': (('like_count',), lambda article: article.like_count),
+    'comment_count': (('comment_count',), lambda article: article.comment_count),
+    'user': (('user', 'user__username'), lambda article: {'id': article.user_id, 'username': article.user.username}),
+    # prefetch (쿼리 1개)
+    'hashtags': ((), lambda article: [{'id': tag.id, 'content': tag.content} for tag in article.hashtags.all()]),
+}
+# updated_at은 글을 수정할 때만 바뀌고 카운터(F() UPDATE)와 작성자 username은 바꾸지 않는다.
+# 이 필드를 요청하면 Last-Modified 없이 ETag로만 비교한다.
+ETAG_ONLY_FIELDS = {'like_count', 'comment_count', 'user'}
+
+
+class FieldError(ValueError):
+    pass
+
+
+def error(message, status=400, **extra):
+    return JsonResponse({'error': message, **extra}, status=status)
+
+
+def login_required_json(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error('로그인이 필요합니다.', status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def safe_read_only(view):
+    # GET/HEAD만 replica에서 읽는다. (쓰기 요청의 조회는 default에서)
+    read_view = read_only(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return read_view(request, *args, **kwargs)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def strong_if_match(view):
+    # gzip_page가 압축한 응답의 ETag를 weak(W/)으로 바꾸므로
+    # If-Match(strong 비교)에 그 값을 그대로 보내도 비교되도록 W/를 뗀다.
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if_match = request.META.get('HTTP_IF_MATCH')
+        if if_match:
+            request.META['HTTP_IF_MATCH'] = if_match.replace('W/', '')
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def requested_fields(request):
+    value = request.GET.get('fields')
+    if not value:
+        return list(ARTICLE_FIELDS)
+    fields = list(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in ARTICLE_FIELDS]
+    if unknown or not fields:
+        raise FieldError(unknown)
+    return fields
+
+
+def page_size(request):
+    try:
+        limit = int(request.GET.get('limit', settings.ARTICLES_PAGE_SIZE))
+    except ValueError:
+        limit = settings.ARTICLES_PAGE_SIZE
+    return max(1, min(limit, settings.API_MAX_PAGE_SIZE))
+
+
+def article_queryset(fields, prefix=''):
+    """fields에 필요한 컬럼만 읽는 queryset의 (only, select_related, prefetch_related) 인자"""
+    columns = {f'{prefix}id'}
+    for field in fields:
+        columns.update(prefix + column for column in ARTICLE_FIELDS[field][0])
+    select = [f'{prefix}user'] if 'user' in fields else []
+    prefetch = []
+    if 'hashtags' in fields:
+        prefetch.append(Prefetch(f'{prefix}hashtags', queryset=HashTag.objects.only('id', 'content')))
+    return columns, select, prefetch
+
+
+def articles_only(queryset, fields):
+    columns, select, prefetch = article_queryset(fields)
+    return queryset.only(*columns).select_related(*select).prefetch_related(*prefetch)
+
+
+def serialize_article(article, fields):
+    return {field: ARTICLE_FIELDS[field][1](article) for field in fields}
+
+
+def request_data(request):
+    # JSON body 또는 form (이미지는 multipart로만)
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            raise FieldError('JSON 형식이 아닙니다.')
+        if not isinstance(data, dict):
+            raise FieldError('JSON object가 필요합니다.')
+        return data
+    return request.POST
+
+
+def article_response(article_pk, fields, status=200):
+    article = articles_only(Article.objects.filter(pk=article_pk), fields).get()
+    return JsonResponse(serialize_article(article, fields), status=status)
+
+
+@stream_image_upload
+@gzip_page
+@require_http_methods(['GET', 'HEAD', 'POST'])
+@safe_read_only
+def article_list(request):
+    try:
+        fields = requested_fields(request)
+    except FieldError as e:
+        return error('알 수 없는 필드입니다.', fields=e.args[0], allowed=list(ARTICLE_FIELDS))
+    if request.method == 'POST':
+        return article_create(request, fields)
+    articles, next_cursor = paginate(
+        articles_only(Article.objects.all(), fields), request.GET.get('before'), page_size(request),
+    )
+    return JsonResponse({
+        'articles': [serialize_article(article, fields) for article in articles],
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required_json
+def article_create(request, fields):
+    try:
+        form = ArticleForm(request_data(request), request.FILES, upload_errors=upload_errors(request))
+    except FieldError as e:
+        return error(str(e))
+    if not form.is_valid():
+        return error('입력값이 올바르지 않습니다.', errors=form.errors)
+    article = form.save(commit=False)
+    article.user = request.user
+    article.save()  # 해시태그/timeline/검색 index는 signal에서
+    return article_response(article.pk, fields, status=201)
+
+
+def _article_state(request, article_pk):
+    # ETag/Last-Modified 계산용 : 본문 없이 pk index로 row 하나 (요청마다 한 번만)
+    if not hasattr(request, '_article_state'):
+        request._article_state = Article.objects.filter(pk=article_pk).values_list(
+            'updated_at', 'like_count', 'comment_count', 'user__username',
+        ).first()
+    return request._article_state
+
+
+def article_etag(request, article_pk):
+    state = _article_state(request, article_pk)
+    if state is None:
+        return None
+    try:
+        fields = requested_fields(request)
+    except FieldError:
+        return None
+    updated_at, like_count, comment_count, username = state
+    # 같은 글이라도 fields에 따라 응답이 다르므로 ETag에 포함
+    etag = f'{article_pk}-{updated_at.timestamp()}-{like_count}-{comment_count}-{".".join(fields)}'
+    if 'user' in fields:
+        # 작성자 이름이 바뀌면 응답도 바뀐다. (header는 latin-1이라 hash로)
+        etag += '-' + hashlib.md5(username.encode('utf-8')).hexdigest()[:8]
+    return etag
+
+
+def article_last_modified(request, article_pk):
+    # 카운터, 작성자 username을 요청하면 ETag로만 비교한다.
+    try:
+        fields = requested_fields(request)
+    except FieldError:
+        return None
+    state = _article_state(request, article_pk)
+    if state is None or ETAG_ONLY_FIELDS.intersection(fields):
+        return None
+    return state[0]
+
+
+@gzip_page
+@require_http_methods(['GET', 'HEAD', 'PATCH', 'DELETE'])
+@safe_read_only
+@strong_if_match
+@condition(etag_func=article_etag, last_modified_func=article_last_modified)
+def article_detail(request, article_pk):
+    # If-None-Match/If-Modified-Since가 맞으면 condition이 여기까지 오지 않고 304를 돌려준다.
+    # PATCH/DELETE에 If-Match를 보내면 그 사이 바뀐 글은 412 (덮어쓰기 방지)
+    try:
+        fields = requested_fields(request)
+    except FieldError as e:
+        return error('알 수 없는 필드입니다.', fields=e.args[0], allowed=list(ARTICLE_FIELDS))
+    if request.method == 'PATCH':
+        return article_update(request, article_pk, fields)
+    if request.method == 'DELETE':
+        return article_delete(request, article_pk)
+    article = get_object_or_404(articles_only(Article.objects.all(), fields), pk=article_pk)
+    return JsonResponse(serialize_article(article, fields))
+
+
+@login_required_json
+def article_update(request, article_pk, fields):
+    article = get_object_or_404(Article, pk=article_pk)
+    if article.user_id != request.user.pk:
+        return error('권한이 없습니다.', status=403)
+    # Django는 PATCH의 form body를 읽지 않으므로 (request.POST가 비어 있다) JSON만 받는다.
+    if request.content_type != 'application/json':
+        return error('PATCH는 application/json만 지원합니다.', status=415)
+    try:
+        data = request_data(request)
+    except FieldError as e:
+        return error(str(e))
+    # 보내지 않은 필드는 그대로
+    form = ArticleForm({
+        'title': data.get('title', article.title),
+        'content': data.get('content', article.content),
+    }, instance=article)
+    if not form.is_valid():
+        return error('입력값이 올바르지 않습니다.', errors=form.errors)
+    form.save()
+    return article_response(article.pk, fields)
+
+
+@login_required_json
+def article_delete(request, article_pk):
+    article = get_object_or_404(Article, pk=article_pk)
+    if article.user_id != request.user.pk:
+        return error('권한이 없습니다.', status=403)
+    article.delete()
+    return HttpResponse(status=204)
+
+
+@gzip_page
+@require_http_methods(['GET', 'HEAD', 'POST'])
+@safe_read_only
+def comment_list(request, article_pk):
+    if request.method == 'POST':
+        return comment_create(request, article_pk)
+    get_object_or_404(Article.objects.only('id'), pk=article_pk)
+    comments, next_cursor = comment_page(article_pk, request.GET.get('after'))
+    return JsonResponse({
+        'comments': [serialize_comment(comment) for comment in comments],
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required_json
+def comment_create(request, article_pk):
+    article = get_object_or_404(Article.objects.only('id'), pk=article_pk)
+    try:
+        form = CommentForm(request_data(request))
+    except FieldError as e:
+        return error(str(e))
+    if not form.is_valid():
+        return error('입력값이 올바르지 않습니다.', errors=form.errors)
+    comment = form.save(commit=False)
+    comment.article = article
+    comment.user = request.user
+    comment.save()
+    return JsonResponse(serialize_comment(comment), status=201)
+
+
+@require_http_methods(['DELETE'])
+@login_required_json
+def comment_delete(request, comment_pk):
+    comment = get_object_or_404(Comment, pk=comment_pk)
+    if comment.user_id != request.user.pk:
+        return error('권한이 없습니다.', status=403)
+    comment.delete()
+    return HttpResponse(status=204)
+
+
+@require_http_methods(['POST'])
+@login_required_json
+def like(request, article_pk):
+    article = get_object_or_404(Article.objects.only('id'), pk=article_pk)
+    is_liked, like_count = likes.toggle_like(article.pk, request.user.pk)
+    return JsonResponse({'is_liked': is_liked, 'like_count': like_count})
+
+
+@gzip_page
+@require_http_methods(['GET', 'HEAD'])
+@read_only
+def hashtag_list(request):
+    # 인기 태그 : (window, -count) index 한 번 읽기
+    window = request.GET.get('window', 'day')
+    if window not in settings.TRENDING_WINDOWS:
+        return error('알 수 없는 기간입니다.', allowed=list(settings.TRENDING_WINDOWS))
+    return JsonResponse({
+        'window': window,
+        'hashtags': [
+            {'id': trend.hashtag_id, 'content': trend.hashtag.content, 'count': trend.count}
+            for trend in trending.top_tags(window, page_size(request))
+        ],
+    })
+
+
+@gzip_page
+@require_http_methods(['GET', 'HEAD'])
+@read_only
+def hashtag_detail(request, tag_pk):
+    try:
+        fields = requested_fields(request)
+    except FieldError as e:
+        return error('알 수 없는 필드입니다.', fields=e.args[0], allowed=list(ARTICLE_FIELDS))
+    hashtag = get_object_or_404(HashTag, pk=tag_pk)
+    # through table의 (hashtag_id, article_id) index로 최신 글부터 한 페이지
+    columns, select, prefetch = article_queryset(fields, prefix='article__')
+    entries, next_cursor = paginate(
+        Article.hashtags.through.objects.filter(hashtag_id=hashtag.pk).only('article', *columns)
+        .select_related('article', *select).prefetch_related(*prefetch),
+        request.GET.get('before'), page_size(request), key='article_id',
+    )
+    return JsonResponse({
+        'id': hashtag.id,
+        'content': hashtag.content,
+        'articles': [serialize_article(entry.article, fields) for entry in entries],
+        'next_cursor': next_cursor,
+    })
@@ -0,0 +1,15 @@
+from django.urls import path
+
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('articles/', api.article_list, name='article_list'),
+    path('articles/<int:article_pk>/', api.article_detail, name='article_detail'),
+    path('articles/<int:article_pk>/comments/', api.comment_list, name='comment_list'),
+    path('articles/<int:article_pk>/like/', api.like, name='like'),
+    path('comments/<int:comment_pk>/', api.comment_delete, name='comment_delete'),
+    path('hashtags/', api.hashtag_list, name='hashtag_list'),
+    path('hashtags/<int:tag_pk>/', api.hashtag_detail, name='hashtag_detail'),
+]
@@ -0,0 +1,23 @@
+import uuid
+
+from django.core.cache import cache
+
+# 상세 페이지 fragment cache
+# fragment key에 글의 version을 넣어 두고, 글/댓글/좋아요가 바뀌면 version만 바꾼다.
+# (이전 version의 fragment는 더 이상 조회되지 않고 timeout이 지나면 사라진다.)
+
+
+def version_key(article_id):
+    return f'articles:article:{article_id}:version'
+
+
+def article_version(article_id):
+    return cache.get_or_set(version_key(article_id), lambda: uuid.uuid4().hex, None)
+
+
+def invalidate_article(article_id):
+    cache.set(version_key(article_id), uuid.uuid4().hex, None)
+
+
+def forget_article(article_id):
+    cache.delete(version_key(article_id))
@@ -0,0 +1,24 @@
+from django.conf import settings
+
+from .models import Comment
+from .pagination import paginate
+
+
+def comment_page(article_id, cursor=None):
+    """작성자를 join해서 오래된 순으로 댓글 한 페이지와 다음 페이지 커서를 돌려준다."""
+    comments = Comment.objects.filter(article_id=article_id).select_related('user').only(
+        'id', 'content', 'created_at', 'article_id', 'user', 'user__username',
+    )
+    return paginate(comments, cursor, settings.COMMENTS_PAGE_SIZE, descending=False)
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.id,
+        'content': comment.content,
+        'created_at': comment.created_at.isoformat(),
+        'user': {
+            'id': comment.user_id,
+            'username': comment.user.username,
+        },
+    }
@@ -0,0 +1,12 @@
+from django.db.models import OuterRef
+
+from crud.counters import count_subquery
+
+
+def recount_articles(Article, Comment):
+    """like_count, comment_count를 실제 row 수로 다시 계산한다."""
+    Like = Article.like_users.through
+    return Article.objects.update(
+        like_count=count_subquery(Like.objects.filter(article_id=OuterRef('pk')), 'article_id'),
+        comment_count=count_subquery(Comment.objects.filter(article_id=OuterRef('pk')), 'article_id'),
+    )
@@ -1,6 +1,17 @@
 from django import forms
 from .models import Article, Comment
 class ArticleForm(forms.ModelForm):
+    def __init__(self, *args, upload_errors=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        # 업로드 중에 거부된 이미지 (articles/uploadhandlers.py)
+        self.upload_errors = list(upload_errors)
+
+    def clean_image(self):
+        if self.upload_errors:
+            raise forms.ValidationError(self.upload_errors)
+        return self.cleaned_data.get('image')
+
+
     # 위젯 설정 2.
     title = forms.CharField(
         max_length=30, 
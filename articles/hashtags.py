@@ -0,0 +1,77 @@
+import re
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils.html import escape
+
+from .models import Article, HashTag
+from .pagination import paginate
+
+MAX_LENGTH = HashTag._meta.get_field('content').max_length
+
+# 공백 뒤(또는 맨 앞)에서 #으로 시작하는 단어
+HASHTAG_RE = re.compile(r'(?<!\S)#\S+')
+
+
+def extract_hashtags(content):
+    # 공백으로 나눈 단어 중 #으로 시작하는 것. 순서를 유지하면서 중복 제거
+    # HashTag.content보다 긴 단어는 태그로 만들지 않는다.
+    return list(dict.fromkeys(tag for tag in HASHTAG_RE.findall(content) if len(tag) <= MAX_LENGTH))
+
+
+def render_content(content, tag_ids):
+    """content를 escape하고 해시태그를 /hashtags/<pk>/ 링크로 바꾼다. (정규식 한 번)
+
+    tag_ids : {'#태그': HashTag pk}
+    """
+    html = []
+    position = 0
+    for match in HASHTAG_RE.finditer(content):
+        word = match.group()
+        html.append(escape(content[position:match.start()]))
+        if word in tag_ids:
+            html.append(f'<a href="{reverse("hashtag", args=[tag_ids[word]])}">{escape(word)}</a>')
+        else:
+            html.append(escape(word))
+        position = match.end()
+    html.append(escape(content[position:]))
+    return ''.join(html)
+
+
+def sync_hashtags(article):
+    """article.content의 해시태그와 article.hashtags, article.content_html을 맞춘다.
+
+    태그 수와 관계없이 쿼리 수가 일정하다. 추가/삭제된 HashTag id set을 돌려준다.
+    """
+    names = extract_hashtags(article.content)
+    Through = Article.hashtags.through
+    with transaction.atomic():
+        tag_ids = {}
+        if names:
+            HashTag.objects.bulk_create([HashTag(content=name) for name in names], ignore_conflicts=True)
+            tag_ids = dict(HashTag.objects.filter(content__in=names).values_list('content', 'id'))
+        new = set(tag_ids.values())
+        current = set(Through.objects.filter(article_id=article.pk).values_list('hashtag_id', flat=True))
+        added, removed = new - current, current - new
+        if removed:
+            Through.objects.filter(article_id=article.pk, hashtag_id__in=removed).delete()
+        Through.objects.bulk_create([Through(article_id=article.pk, hashtag_id=tag_id) for tag_id in added])
+        article.content_html = render_content(article.content, tag_ids)
+        Article.objects.filter(pk=article.pk).update(content_html=article.content_html)
+    return added, removed
+
+
+def tagged_articles(hashtag_id, cursor=None):
+    """태그가 달린 글 최신순 한 페이지와 다음 페이지 커서
+
+    through table의 (hashtag_id, article_id) index 범위 조회, 작성자는 join
+    """
+    entries, next_cursor = paginate(
+        Article.hashtags.through.objects.filter(hashtag_id=hashtag_id).select_related('article__user').only(
+            'article', *(f'article__{field}' for field in ('id', 'title', 'created_at', 'user')),
+            'article__user__username',
+        ),
+        cursor,
+        key='article_id',
+    )
+    return [entry.article for entry in entries], next_cursor
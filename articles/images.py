@@ -0,0 +1,40 @@
+from django.conf import settings
+from imagekit.cachefiles import ImageCacheFile
+from imagekit.specs import ImageSpec
+from pilkit.processors import ResizeToFit
+
+# Article.image의 반응형 이미지 (너비 x 포맷 별 variant)
+# imagekit spec이므로 기존 썸네일과 같은 CACHE/images/<원본 경로>/<hash>.<ext> 에 저장된다.
+# 만드는 작업은 썸네일과 같은 thread pool backend를 사용한다. (articles/thumbnails.py)
+
+CONTENT_TYPES = {
+    'AVIF': 'image/avif',
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+}
+# <img> srcset에 쓰는 포맷. 준비되지 않았으면 원본 파일을 쓴다.
+FALLBACK_FORMAT = 'JPEG'
+
+
+class VariantSpec(ImageSpec):
+    def __init__(self, source, width, format):
+        super().__init__(source)
+        self.width = width
+        self.format = format
+        self.processors = [ResizeToFit(width=width, upscale=False)]
+        self.options = {'quality': settings.ARTICLE_IMAGE_QUALITY}
+
+
+def image_variants(image):
+    """{format: [(width, ImageCacheFile), ...]} (settings 순서 유지)"""
+    return {
+        format: [(width, ImageCacheFile(VariantSpec(image, width, format))) for width in settings.ARTICLE_IMAGE_WIDTHS]
+        for format in settings.ARTICLE_IMAGE_FORMATS
+    }
+
+
+def schedule_variants(image):
+    for variants in image_variants(image).values():
+        for width, variant in variants:
+            variant.generate()
@@ -0,0 +1,34 @@
+from django.db import IntegrityError, transaction
+
+from crud.counters import adjust
+
+from . import cache
+from .models import Article
+
+
+def toggle_like(article_id, user_id):
+    """좋아요 토글. (is_liked, like_count)를 돌려준다.
+
+    좋아요 목록 전체를 읽지 않고 (article_id, user_id) unique index만 사용하므로
+    좋아요 수와 관계없이 쿼리 수와 비용이 일정하다.
+    """
+    Like = Article.like_users.through
+    with transaction.atomic():
+        # 이미 눌렀다면 DELETE 한 번으로 확인과 취소를 함께 처리
+        deleted, _ = Like.objects.filter(article_id=article_id, user_id=user_id).delete()
+        if deleted:
+            is_liked, delta = False, -1
+        else:
+            try:
+                with transaction.atomic():
+                    Like.objects.create(article_id=article_id, user_id=user_id)
+                is_liked, delta = True, 1
+            except IntegrityError:
+                # 동시에 들어온 같은 요청이 먼저 추가한 경우
+                is_liked, delta = True, 0
+        if delta:
+            # 감소는 0에서 멈춘다.
+            adjust(Article, [article_id], 'like_count', delta)
+            cache.invalidate_article(article_id)
+        like_count = Article.objects.filter(pk=article_id).values_list('like_count', flat=True).get()
+    return is_liked, like_count
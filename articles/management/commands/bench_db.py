@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from crud.db import SQLITE_PRAGMAS, apply_sqlite_pragmas
+
+
+class Command(BaseCommand):
+    help = '기본 SQLite 설정과 crud.db의 PRAGMA 설정에서 동시 읽기/쓰기 처리량을 비교한다. (임시 DB 파일 사용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'profile':>8} {'reads/s':>10} {'writes/s':>10} {'locked':>8}")
+        profiles = [
+            ('default', ()),
+            ('tuned', SQLITE_PRAGMAS),
+        ]
+        for label, pragmas in profiles:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'bench.sqlite3')
+                self.prepare(path, options['rows'])
+                reads, writes, locked = self.run(path, pragmas, options)
+            seconds = options['seconds']
+            self.stdout.write(f'{label:>8} {reads / seconds:>10.0f} {writes / seconds:>10.0f} {locked:>8}')
+
+    def prepare(self, path, rows):
+        db = sqlite3.connect(path)
+        db.execute('CREATE TABLE article (id INTEGER PRIMARY KEY, title TEXT, content TEXT, like_count INTEGER)')
+        db.executemany(
+            'INSERT INTO article (title, content, like_count) VALUES (?, ?, 0)',
+            ((f'title {i}', 'content ' * 20) for i in range(rows)),
+        )
+        db.commit()
+        db.close()
+
+    def run(self, path, pragmas, options):
+        counts = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+        rows = options['rows']
+
+        def connect():
+            # Django 기본값과 같은 python sqlite3 기본 timeout(5초)
+            db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            apply_sqlite_pragmas(db.cursor(), pragmas)
+            return db
+
+        def reader(db, seed):
+            done = locked = 0
+            while time.perf_counter() < deadline:
+                start = (seed * 7919 + done * 101) % rows
+                try:
+                    db.execute('SELECT id, title FROM article WHERE id > ? ORDER BY id LIMIT 20', (start,)).fetchall()
+                    done += 1
+                except sqlite3.OperationalError:
+                    locked += 1
+            db.close()
+            with lock:
+                counts['reads'] += done
+                counts['locked'] += locked
+
+        def writer(db, seed):
+            done = locked = 0
+            while time.perf_counter() < deadline:
+                try:
+                    db.execute('BEGIN IMMEDIATE')
+                    db.execute('UPDATE article SET like_count = like_count + 1 WHERE id = ?', ((seed + done) % rows + 1,))
+                    db.execute('COMMIT')
+                    done += 1
+                except sqlite3.OperationalError:
+                    if db.in_transaction:
+                        db.execute('ROLLBACK')
+                    locked += 1
+            db.close()
+            with lock:
+                counts['writes'] += done
+                counts['locked'] += locked
+
+        # connection은 미리 열어 두고 측정 시간에는 쿼리만
+        threads = [threading.Thread(target=reader, args=(connect(), i)) for i in range(options['readers'])]
+        threads += [threading.Thread(target=writer, args=(connect(), i)) for i in range(options['writers'])]
+        deadline = time.perf_counter() + options['seconds']
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts['reads'], counts['writes'], counts['locked']
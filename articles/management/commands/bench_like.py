@@ -0,0 +1,63 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from articles.likes import toggle_like
+from articles.models import Article
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = '좋아요 수에 따른 좋아요 토글 비용을 측정한다. (모든 데이터는 rollback)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--likers', type=int, nargs='+', default=[10, 1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'likers':>8} {'toggle ms':>10} {'queries':>8} {'legacy ms':>10}")
+        for likers in options['likers']:
+            try:
+                with transaction.atomic():
+                    self.run(likers, options['repeat'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def run(self, likers, repeat):
+        User = get_user_model()
+        author = User.objects.create(username='bench-like-author')
+        article = Article.objects.create(title='bench', content='bench', user=author)
+        User.objects.bulk_create([User(username=f'bench-like-{i}') for i in range(likers)])
+        user_ids = User.objects.filter(username__startswith='bench-like-').exclude(pk=author.pk).values_list('pk', flat=True)
+        Like = Article.like_users.through
+        Like.objects.bulk_create([Like(article_id=article.pk, user_id=user_id) for user_id in user_ids])
+        Article.objects.filter(pk=article.pk).update(like_count=likers)
+
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                toggle_like(article.pk, author.pk)
+                timings.append(time.perf_counter() - started)
+
+        # 기존 방식 : request.user in article.like_users.all()
+        legacy = []
+        for _ in range(max(1, repeat // 20)):
+            started = time.perf_counter()
+            author in article.like_users.all()
+            legacy.append(time.perf_counter() - started)
+
+        self.stdout.write('{:>8} {:>10.3f} {:>8.1f} {:>10.3f}'.format(
+            likers,
+            statistics.median(timings) * 1000,
+            len(queries) / repeat,
+            statistics.median(legacy) * 1000,
+        ))
@@ -0,0 +1,121 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.urls import reverse
+
+from accounts import urls as accounts_urls
+from articles import api_urls, urls as articles_urls
+from articles.models import Article, Comment, HashTag
+
+from .seed import SEED_PASSWORD
+
+
+class Rollback(Exception):
+    pass
+
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+JSON = {'content_type': 'application/json'}
+
+
+class Command(BaseCommand):
+    help = 'articles.urls, accounts.urls, articles.api_urls의 모든 URL을 test client로 요청해서 p50/p99 응답 시간과 쿼리 수를 출력한다. (쓰기는 rollback)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--user', help='로그인할 사용자 (기본 : 팔로우가 가장 많은 사용자, 비밀번호는 seed 비밀번호)')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.order_by('-following_count', 'pk').first()
+        # 좋아요/댓글이 가장 많은 글 : 가장 무거운 상세 페이지
+        article = Article.objects.filter(user=user).order_by('-comment_count').first() or Article.objects.order_by('-comment_count').first()
+        if user is None or article is None:
+            raise CommandError('데이터가 없습니다. 먼저 manage.py seed를 실행하세요.')
+        comment = Comment.objects.filter(user=user).order_by('-id').first()
+        other = User.objects.exclude(pk=user.pk).order_by('-follower_count').first() or user
+        tag = HashTag.objects.filter(articles=article).first() or HashTag.objects.first()
+        # 팔로워가 많은 사용자들 : 한 번에 팔로우/취소
+        popular = list(User.objects.exclude(pk=user.pk).order_by('-follower_count').values_list('username', flat=True)[:100])
+
+        # ALLOWED_HOSTS에 testserver 추가, locmem email backend
+        setup_test_environment()
+        client = Client()
+        if not client.login(username=user.username, password=SEED_PASSWORD):
+            client.force_login(user)
+
+        # url name -> (method, args, data, extra)
+        cases = {
+            'articles:index': ('get', [], {}, {}),
+            'articles:create': ('post', [], {'title': 'bench', 'content': 'bench #bench'}, {}),
+            'articles:detail': ('get', [article.pk], {}, {}),
+            'articles:delete': ('post', [article.pk], {}, {}),
+            'articles:update': ('get', [article.pk], {}, {}),
+            'articles:comment_create': ('post', [article.pk], {'content': 'bench'}, {}),
+            'articles:comment_list': ('get', [article.pk], {}, AJAX),
+            'articles:like': ('post', [article.pk], {}, AJAX),
+            'articles:explore': ('get', [], {}, {}),
+            'articles:search': ('get', [], {'q': 'seed'}, {}),
+            'accounts:signup': ('get', [], {}, {}),
+            'accounts:login': ('get', [], {}, {}),
+            'accounts:logout': ('get', [], {}, {}),
+            'accounts:update': ('get', [], {}, {}),
+            'accounts:password_change': ('get', [], {}, {}),
+            'accounts:profile': ('get', [user.pk], {}, {}),
+            'accounts:follow': ('get', [other.pk], {}, {}),
+            'accounts:followers': ('get', [other.pk], {}, {}),
+            'accounts:followings': ('get', [user.pk], {}, {}),
+            'accounts:mutuals': ('get', [user.pk], {}, {}),
+            'accounts:follow_bulk': ('post', [], {'usernames': popular}, AJAX),
+            'api:article_list': ('get', [], {}, {}),
+            'api:article_detail': ('get', [article.pk], {}, {}),
+            'api:comment_list': ('get', [article.pk], {}, {}),
+            'api:like': ('post', [article.pk], {}, {}),
+            'api:hashtag_list': ('get', [], {}, {}),
+            'api:hashtag_detail': ('get', [tag.pk if tag else 0], {}, {}),
+            'hashtag': ('get', [tag.pk if tag else 0], {}, {}),
+        }
+        if comment is not None:
+            cases['articles:comment_delete'] = ('post', [comment.article_id, comment.pk], {}, {})
+            cases['api:comment_delete'] = ('delete', [comment.pk], {}, JSON)
+        names = [f'{module.app_name}:{pattern.name}' for module in (articles_urls, accounts_urls, api_urls) for pattern in module.urlpatterns]
+        names.append('hashtag')
+
+        self.stdout.write(f"{'url':<26} {'status':>6} {'p50 ms':>8} {'p99 ms':>8} {'queries':>8}")
+        for name in names:
+            if name not in cases:
+                self.stdout.write(f'{name:<26} (skipped : no case)')
+                continue
+            method, args, data, extra = cases[name]
+            url = reverse(name, args=args)
+            timings, queries, status = [], [], None
+            for _ in range(options['repeat']):
+                # 쓰기 요청도 매번 같은 상태에서 측정하도록 rollback
+                try:
+                    with transaction.atomic():
+                        with CaptureQueriesContext(connection) as captured:
+                            started = time.perf_counter()
+                            response = getattr(client, method)(url, data, **extra)
+                            timings.append(time.perf_counter() - started)
+                        raise Rollback
+                except Rollback:
+                    pass
+                status = response.status_code
+                queries.append(len(captured))
+                if name == 'accounts:logout':
+                    client.force_login(user)
+            timings.sort()
+            self.stdout.write('{:<26} {:>6} {:>8.2f} {:>8.2f} {:>8.1f}'.format(
+                name, status,
+                statistics.median(timings) * 1000,
+                timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000,
+                statistics.mean(queries),
+            ))
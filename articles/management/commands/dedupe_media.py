@@ -0,0 +1,27 @@
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from articles import storage
+from articles.models import Article
+
+
+class Command(BaseCommand):
+    help = 'blobs/ 밖에 있는 기존 Article 이미지를 내용 주소 저장소로 옮겨 중복을 합친다.'
+
+    def handle(self, *args, **options):
+        moved = {}
+        articles = Article.objects.exclude(image='').exclude(image__startswith=f'{storage.BLOB_DIR}/')
+        for article_id, name in articles.values_list('id', 'image').iterator():
+            if name not in moved:
+                if not storage.blob_storage.exists(name):
+                    self.stderr.write(f'  파일 없음 {name}')
+                    continue
+                with storage.blob_storage.open(name) as f:
+                    moved[name] = storage.blob_storage.save(name, File(f, name=name))
+            # queryset update는 signal이 없으므로 참조 수를 직접 옮긴다.
+            Article.objects.filter(pk=article_id).update(image=moved[name])
+            storage.retain(moved[name])
+            storage.release(name)
+        self.stdout.write(self.style.SUCCESS(
+            f'파일 {len(moved)}개를 blob {len(set(moved.values()))}개로 합쳤습니다.'
+        ))
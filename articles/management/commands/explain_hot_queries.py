@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.profiles import load_profile
+from articles import hashtags, timeline, trending
+from articles.comments import comment_page
+from articles.models import Article, HashTag
+
+
+class Command(BaseCommand):
+    help = 'view에서 실행하는 주요 쿼리의 EXPLAIN 결과를 출력한다. (index를 타는지 확인용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='explore/프로필 쿼리에 쓸 user pk (기본 : 첫 번째 user)')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        user = User.objects.filter(pk=options['user']) if options['user'] else User.objects.order_by('pk')
+        user = user.first()
+        if user is None:
+            raise CommandError('user가 없습니다.')
+        article_id = Article.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        hashtag_id = HashTag.objects.order_by('pk').values_list('id', flat=True).first() or 0
+
+        # view와 같은 함수를 실행하고 실제로 나간 쿼리를 EXPLAIN 한다. (쿼리를 따로 베껴 두지 않는다.)
+        # explore의 인기 작성자 쿼리는 user가 인기 작성자를 팔로우할 때만 나간다.
+        views = [
+            ('index', lambda: timeline.latest_articles()),
+            ('explore', lambda: timeline.home_timeline(user)),
+            ('detail (comments)', lambda: comment_page(article_id)),
+            ('hashtag', lambda: hashtags.tagged_articles(hashtag_id)),
+            ('trending tags', lambda: trending.top_tags()),
+            ('profile', lambda: load_profile(user.pk, user)),
+        ]
+        prefix = connection.ops.explain_query_prefix()
+        for name, view in views:
+            with CaptureQueriesContext(connection) as queries:
+                view()
+            for query in queries:
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(query['sql'])
+                with connection.cursor() as cursor:
+                    cursor.execute(f'{prefix} {query["sql"]}')
+                    for row in cursor.fetchall():
+                        self.stdout.write(row if isinstance(row, str) else ' '.join(str(column) for column in row))
+                self.stdout.write('')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from articles import search
+
+
+class Command(BaseCommand):
+    help = '검색 index를 비우고 모든 글/댓글을 batch 단위로 다시 넣는다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        articles, comments = search.rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'글 {articles}개, 댓글 {comments}개를 검색 index에 넣었습니다.'))
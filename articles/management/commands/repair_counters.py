@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from accounts.counters import recount_follows
+from articles.counters import recount_articles
+from articles.models import Article, Comment
+
+
+class Command(BaseCommand):
+    help = '좋아요/댓글/팔로우 카운터 컬럼을 실제 row 수로 다시 계산한다.'
+
+    def handle(self, *args, **options):
+        articles = recount_articles(Article, Comment)
+        users = recount_follows(get_user_model())
+        self.stdout.write(self.style.SUCCESS(f'articles {articles}개, users {users}개 카운터를 다시 계산했습니다.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from articles import trending
+
+
+class Command(BaseCommand):
+    help = '기간이 지난 태그 집계를 빼고 인기 태그를 다시 만든다. (하루 한 번 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recount', action='store_true', help='날짜별 집계도 글/태그 데이터로 처음부터 다시 계산')
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            trending.recount()
+        else:
+            trending.roll()
+        self.stdout.write(self.style.SUCCESS('인기 태그를 다시 계산했습니다.'))
@@ -0,0 +1,167 @@
+import itertools
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+
+from accounts.counters import recount_follows
+from articles import search, timeline, trending
+from articles.counters import recount_articles
+from articles.hashtags import render_content
+from articles.models import Article, Comment, HashTag
+
+SEED_PASSWORD = 'seed-password'
+
+
+def zipf_weights(n, exponent):
+    # rank가 낮을수록(앞쪽일수록) 많이 뽑히는 누적 가중치 : 일부 인기 사용자/글/태그에 몰리는 분포
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'bulk_create로 대량의 사용자/팔로우/글/댓글/좋아요/해시태그를 만든다. (signal을 거치지 않으므로 파생 데이터는 마지막에 다시 계산)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--follows', type=int, default=20, help='사용자당 평균 팔로우 수')
+        parser.add_argument('--articles', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--likes', type=int, default=100000)
+        parser.add_argument('--hashtags', type=int, default=500)
+        parser.add_argument('--exponent', type=float, default=1.1, help='인기 편중 정도 (zipf 지수)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='seed')
+        parser.add_argument('--random-seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['random_seed'])
+        self.options = options
+        self.batch_size = options['batch_size']
+
+        user_ids = self.step('users', self.create_users)
+        self.step('follows', self.create_follows, user_ids)
+        tag_ids = self.step('hashtags', self.create_hashtags)
+        article_ids = self.step('articles', self.create_articles, user_ids, tag_ids)
+        self.step('comments', self.create_comments, user_ids, article_ids)
+        self.step('likes', self.create_likes, user_ids, article_ids)
+        # bulk_create는 signal을 보내지 않으므로 카운터/timeline/인기 태그/검색 index를 다시 만든다.
+        self.step('counters', lambda: (recount_articles(Article, Comment), recount_follows(get_user_model())))
+        self.step('timelines', self.rebuild_timelines, user_ids)
+        self.step('trending', trending.recount)
+        self.step('search index', search.rebuild, self.batch_size)
+
+    def step(self, name, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        count = f' ({len(result)})' if isinstance(result, list) else ''
+        self.stdout.write(f'{name}{count} : {time.perf_counter() - started:.1f}s')
+        return result
+
+    def rebuild_timelines(self, user_ids):
+        # seed 사용자는 seed 사용자만 팔로우하고 새 글도 모두 seed 사용자가 쓰므로
+        # 이번에 만든 사용자(연속된 id)의 글만 다시 펼친다. (기존 timeline은 그대로)
+        if not user_ids:
+            return 0
+        return timeline.rebuild(get_user_model().objects.filter(pk__range=(user_ids[0], user_ids[-1])))
+
+    def pick(self, population, weights, k):
+        return self.random.choices(population, cum_weights=weights, k=k)
+
+    def insert(self, model, objects):
+        """bulk_create 후 새로 들어간 row의 id를 넣은 순서대로 돌려준다. (SQLite는 bulk_create가 pk를 채우지 않는다.)"""
+        ids = []
+        for batch in batches(objects, self.batch_size):
+            last_id = model.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            model.objects.bulk_create(batch)
+            ids.extend(model.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True))
+        return ids
+
+    def create_users(self):
+        # 비밀번호 hash는 한 번만 계산 (bench_urls에서 SEED_PASSWORD로 로그인)
+        password = make_password(SEED_PASSWORD)
+        prefix = self.options['prefix']
+        User = get_user_model()
+        start = User.objects.filter(username__startswith=prefix).count()
+        return self.insert(User, (
+            User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', password=password)
+            for i in range(start, start + self.options['users'])
+        ))
+
+    def create_follows(self, user_ids):
+        # 팔로우 수는 사용자마다 다르고(지수분포), 팔로우 대상은 인기 사용자에게 몰린다.
+        Follow = get_user_model().followers.through
+        weights = zipf_weights(len(user_ids), self.options['exponent'])
+        mean = self.options['follows']
+
+        def edges():
+            for follower_id in user_ids:
+                count = min(int(self.random.expovariate(1 / mean)) if mean else 0, len(user_ids) - 1)
+                for author_id in set(self.pick(user_ids, weights, count)) - {follower_id}:
+                    # from_user = 팔로우 당한 사람, to_user = 팔로워
+                    yield Follow(from_user_id=author_id, to_user_id=follower_id)
+
+        for batch in batches(edges(), self.batch_size):
+            Follow.objects.bulk_create(batch, ignore_conflicts=True)
+
+    def create_hashtags(self):
+        prefix = self.options['prefix']
+        names = [f'#{prefix}{i}' for i in range(self.options['hashtags'])]
+        HashTag.objects.bulk_create([HashTag(content=name) for name in names], ignore_conflicts=True)
+        tags = dict(HashTag.objects.filter(content__in=names).values_list('content', 'id'))
+        return [(name, tags[name]) for name in names]
+
+    def create_articles(self, user_ids, tags):
+        # 글을 많이 쓰는 사용자와 팔로워가 많은 사용자는 다르게 (섞은 순서로 편중)
+        authors = self.random.sample(user_ids, len(user_ids))
+        author_weights = zipf_weights(len(user_ids), self.options['exponent'])
+        tag_weights = zipf_weights(len(tags), self.options['exponent']) if tags else None
+        Through = Article.hashtags.through
+        article_ids = []
+        for batch in batches(range(self.options['articles']), self.batch_size):
+            articles, article_tags = [], []
+            for i, author_id in zip(batch, self.pick(authors, author_weights, len(batch))):
+                picked = dict(self.pick(tags, tag_weights, self.random.randint(0, 3))) if tags else {}
+                content = f'seed article {i} ' + ' '.join(picked)
+                articles.append(Article(
+                    title=f'seed {i}'[:10], content=content, user_id=author_id,
+                    content_html=render_content(content, picked),
+                ))
+                article_tags.append(picked.values())
+            ids = self.insert(Article, articles)
+            Through.objects.bulk_create([
+                Through(article_id=article_id, hashtag_id=tag_id)
+                for article_id, tag_ids in zip(ids, article_tags) for tag_id in tag_ids
+            ], ignore_conflicts=True)
+            article_ids.extend(ids)
+        return article_ids
+
+    def create_comments(self, user_ids, article_ids):
+        # 인기 글에 댓글이 몰린다.
+        weights = zipf_weights(len(article_ids), self.options['exponent'])
+        for batch in batches(range(self.options['comments']), self.batch_size):
+            targets = self.pick(article_ids, weights, len(batch))
+            Comment.objects.bulk_create([
+                Comment(content=f'seed comment {i}', article_id=article_id, user_id=self.random.choice(user_ids))
+                for i, article_id in zip(batch, targets)
+            ])
+
+    def create_likes(self, user_ids, article_ids):
+        Like = Article.like_users.through
+        weights = zipf_weights(len(article_ids), self.options['exponent'])
+        for batch in batches(range(self.options['likes']), self.batch_size):
+            targets = self.pick(article_ids, weights, len(batch))
+            pairs = {(article_id, self.random.choice(user_ids)) for article_id in targets}
+            Like.objects.bulk_create([
+                Like(article_id=article_id, user_id=user_id) for article_id, user_id in pairs
+            ], ignore_conflicts=True)
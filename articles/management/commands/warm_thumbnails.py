@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from articles.images import image_variants
+from articles.models import Article
+from articles.thumbnails import generate_file
+
+
+class Command(BaseCommand):
+    help = '아직 만들어지지 않은 Article 썸네일과 반응형 이미지를 병렬로 미리 만든다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.THUMBNAIL_WORKERS * 2)
+        parser.add_argument('--force', action='store_true', help='이미 있는 썸네일도 다시 만든다.')
+
+    def handle(self, *args, **options):
+        missing = []
+        for article in Article.objects.exclude(image='').only('id', 'image').iterator():
+            files = [article.image_thumbnail]
+            for variants in image_variants(article.image).values():
+                files.extend(variant for width, variant in variants)
+            for file in files:
+                if options['force'] or not file.storage.exists(file.name):
+                    missing.append(file)
+        self.stdout.write(f'이미지 {len(missing)}개를 만듭니다.')
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            jobs = {executor.submit(generate_file, file, True): file for file in missing}
+            for job in as_completed(jobs):
+                if job.exception():
+                    failed += 1
+                    self.stderr.write(f'  실패 {jobs[job].name}: {job.exception()}')
+        self.stdout.write(self.style.SUCCESS(f'완료 {len(missing) - failed}개, 실패 {failed}개'))
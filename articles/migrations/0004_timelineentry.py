@@ -0,0 +1,59 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_timelines(apps, schema_editor):
+    # 실행 중과 같은 규칙으로 기존 글을 펼친다.
+    # - 작성자 본인 : 모든 글
+    # - 팔로워 : 팔로워가 TIMELINE_FANOUT_LIMIT명 이하인 작성자의 최근 TIMELINE_BACKFILL_SIZE개 글
+    #   (인기 작성자의 글은 읽을 때 합친다.)
+    fanout_limit = getattr(settings, 'TIMELINE_FANOUT_LIMIT', 1000)
+    backfill_size = getattr(settings, 'TIMELINE_BACKFILL_SIZE', 200)
+    Article = apps.get_model('articles', 'Article')
+    TimelineEntry = apps.get_model('articles', 'TimelineEntry')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Follow = User.followers.through
+    followers = {}
+    for author_id, follower_id in Follow.objects.values_list('from_user_id', 'to_user_id'):
+        followers.setdefault(author_id, []).append(follower_id)
+    recent = {}
+    entries = []
+    for article_id, author_id in Article.objects.order_by('-id').values_list('id', 'user_id').iterator():
+        owner_ids = {author_id}
+        author_followers = followers.get(author_id, ())
+        recent[author_id] = recent.get(author_id, 0) + 1
+        if len(author_followers) <= fanout_limit and recent[author_id] <= backfill_size:
+            owner_ids.update(author_followers)
+        entries.extend(TimelineEntry(owner_id=owner_id, article_id=article_id) for owner_id in owner_ids)
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('articles', '0003_auto_20191024_0919'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='hashtags',
+            field=models.ManyToManyField(blank=True, related_name='articles', to='articles.HashTag'),
+        ),
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='articles.Article')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('owner', 'article')},
+            },
+        ),
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
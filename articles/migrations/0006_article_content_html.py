@@ -0,0 +1,51 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:16
+
+import re
+
+from django.db import migrations, models
+from django.utils.html import escape
+
+# articles.hashtags를 import하지 않도록 마이그레이션 시점의 규칙을 그대로 둔다.
+HASHTAG_RE = re.compile(r'(?<!\S)#\S+')
+
+
+def render_content(content, tag_ids):
+    html = []
+    position = 0
+    for match in HASHTAG_RE.finditer(content):
+        word = match.group()
+        html.append(escape(content[position:match.start()]))
+        if word in tag_ids:
+            html.append(f'<a href="/hashtags/{tag_ids[word]}/">{escape(word)}</a>')
+        else:
+            html.append(escape(word))
+        position = match.end()
+    html.append(escape(content[position:]))
+    return ''.join(html)
+
+
+def render_existing(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    Through = Article.hashtags.through
+    tag_ids = {}
+    for article_id, content, tag_id in Through.objects.values_list('article_id', 'hashtag__content', 'hashtag_id'):
+        tag_ids.setdefault(article_id, {})[content] = tag_id
+    for article in Article.objects.only('id', 'content').iterator():
+        html = render_content(article.content, tag_ids.get(article.id, {}))
+        Article.objects.filter(pk=article.pk).update(content_html=html)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0005_article_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:22
+
+import articles.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_references(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    MediaBlob = apps.get_model('articles', 'MediaBlob')
+    counts = Article.objects.exclude(image='').values('image').annotate(count=Count('id')).order_by()
+    MediaBlob.objects.bulk_create([MediaBlob(name=row['image'], ref_count=row['count']) for row in counts])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0006_article_content_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='image',
+            field=models.ImageField(blank=True, storage=articles.storage.ContentAddressedStorage(), upload_to=''),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
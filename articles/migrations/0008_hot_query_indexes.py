@@ -0,0 +1,37 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+def drop_long_hashtags(apps, schema_editor):
+    # CharField(max_length=255)에 들어가지 않는 태그는 지운다. (새 글에서는 태그로 만들지 않음)
+    HashTag = apps.get_model('articles', 'HashTag')
+    HashTag.objects.filter(content__regex=r'^.{256,}$').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0007_mediablob'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_long_hashtags, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='hashtag',
+            name='content',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['user', '-id'], name='article_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['article', 'id'], name='comment_article_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['user', '-id'], name='comment_user_id_idx'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:30
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def count_trends(apps, schema_editor):
+    # articles.trending.recount와 같은 계산 (historical model 사용)
+    Article = apps.get_model('articles', 'Article')
+    Bucket = apps.get_model('articles', 'HashTagBucket')
+    Trend = apps.get_model('articles', 'HashTagTrend')
+    windows = getattr(settings, 'TRENDING_WINDOWS', {'day': 1, 'week': 7})
+    today = timezone.localdate()
+    start = today - datetime.timedelta(days=max(windows.values()) - 1)
+    counts = {}
+    rows = Article.hashtags.through.objects.filter(
+        article__created_at__gte=timezone.make_aware(datetime.datetime.combine(start, datetime.time())),
+    ).values_list('hashtag_id', 'article__created_at')
+    for hashtag_id, created_at in rows.iterator():
+        key = (hashtag_id, timezone.localdate(created_at))
+        counts[key] = counts.get(key, 0) + 1
+    Bucket.objects.bulk_create([
+        Bucket(hashtag_id=hashtag_id, day=day, count=count) for (hashtag_id, day), count in counts.items()
+    ])
+    for window, days in windows.items():
+        window_start = today - datetime.timedelta(days=days - 1)
+        totals = {}
+        for (hashtag_id, day), count in counts.items():
+            if day >= window_start:
+                totals[hashtag_id] = totals.get(hashtag_id, 0) + count
+        Trend.objects.bulk_create([
+            Trend(hashtag_id=hashtag_id, window=window, count=total) for hashtag_id, total in totals.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HashTagTrend',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trends', to='articles.HashTag')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HashTagBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='articles.HashTag')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='hashtagtrend',
+            index=models.Index(fields=['window', '-count'], name='hashtagtrend_rank_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='hashtagtrend',
+            unique_together={('window', 'hashtag')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='hashtagbucket',
+            unique_together={('hashtag', 'day')},
+        ),
+        # 태그 페이지 : hashtag로 거르고 -article_id 순서로 keyset 페이지네이션
+        # (자동 생성 through table이라 Meta.indexes 대신 SQL로 추가)
+        migrations.RunSQL(
+            'CREATE INDEX articles_article_hashtags_tag_article_idx '
+            'ON articles_article_hashtags (hashtag_id, article_id)',
+            'DROP INDEX articles_article_hashtags_tag_article_idx',
+        ),
+        migrations.RunPython(count_trends, migrations.RunPython.noop),
+    ]
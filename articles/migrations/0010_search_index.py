@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# 전문 검색 테이블 (articles/search.py)
+# articles.search를 import하지 않도록 마이그레이션 시점의 DDL을 그대로 둔다.
+TABLE = 'articles_search'
+
+CREATE_SQL = {
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE {TABLE} USING fts5(title, body, article_id UNINDEXED, tokenize='unicode61')",
+    ],
+    'postgresql': [
+        f'CREATE TABLE {TABLE} (id bigint PRIMARY KEY, article_id integer NOT NULL, document tsvector NOT NULL)',
+        f'CREATE INDEX {TABLE}_document_idx ON {TABLE} USING GIN (document)',
+        f'CREATE INDEX {TABLE}_article_idx ON {TABLE} (article_id)',
+    ],
+}
+
+
+def create_search_table(apps, schema_editor):
+    connection = schema_editor.connection
+    for sql in CREATE_SQL.get(connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_SQL:
+        schema_editor.execute(f'DROP TABLE {TABLE}')
+
+
+def index_existing(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor not in CREATE_SQL:
+        return
+    article_table = apps.get_model('articles', 'Article')._meta.db_table
+    comment_table = apps.get_model('articles', 'Comment')._meta.db_table
+    selects = (
+        f'SELECT id, title, content, id FROM {article_table}',
+        f"SELECT -id, '', content, article_id FROM {comment_table}",
+    )
+    for select in selects:
+        if connection.vendor == 'sqlite':
+            sql = f'INSERT INTO {TABLE} (rowid, title, body, article_id) {select}'
+        else:
+            sql = (
+                f'INSERT INTO {TABLE} (id, article_id, document) '
+                f"SELECT row_id, article_id, setweight(to_tsvector('simple', title), 'A') "
+                f"|| setweight(to_tsvector('simple', body), 'B') "
+                f'FROM ({select}) AS rows (row_id, title, body, article_id)'
+            )
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_hashtag_trends'),
+    ]
+
+    operations = [
+        # SQLite FTS5 / PostgreSQL tsvector 테이블은 DB마다 DDL이 달라서 SQL로 만든다.
+        migrations.RunPython(create_search_table, drop_search_table),
+        migrations.RunPython(index_existing, migrations.RunPython.noop),
+    ]
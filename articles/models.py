@@ -4,24 +4,31 @@ from django.conf import settings
 from imagekit.models import ProcessedImageField, ImageSpecField
 from imagekit.processors import ResizeToFill
 
+from crud.counters import CounterFieldsMixin
+from .storage import blob_storage
+
 # Create your models here.
 # 1. 모델(스키마) 정의
 # 데이터베이스 테이블을 정의하고,
 # 각각의 컬럼(필드) 정의
 
 class HashTag(models.Model):
-    content = models.TextField(unique=True)
+    # 정확히 일치하는 값으로만 조회하므로 길이 제한이 있는 CharField + unique index
+    content = models.CharField(max_length=255, unique=True)
 
     def __str__(self):
         return self.content
 
-class Article(models.Model):
+class Article(CounterFieldsMixin, models.Model):
     # id : integer 자동으로 정의(Primary Key)
     # id = models.AutoField(primary_key=True) -> Integer 값이 자동으로 하나씩 증가(AUTOINCREMENT)
     # CharField - 필수인자로 max_length 지정
     title = models.CharField(max_length=10)
     content = models.TextField()
-    image = models.ImageField(blank=True)
+    # 해시태그를 링크로 바꾼 content (저장할 때 articles/hashtags.py에서 미리 만들어 둔다.)
+    content_html = models.TextField(blank=True, editable=False)
+    # 같은 이미지는 한 번만 저장 (articles/storage.py)
+    image = models.ImageField(blank=True, storage=blob_storage)
     # ImageSpecField : Input 하나만 받고 처리해서 저장
     # ProcessedImageField : Input 받은 것을 처리해서 저장
     # resize to fill : 300 * 300
@@ -41,6 +48,17 @@ class Article(models.Model):
     # settings.AUTH_USER_Model : 'accounts.User'(str)
     like_users = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='like_articles', blank=True)
     hashtags = models.ManyToManyField(HashTag, related_name='articles', blank=True)
+    # 역정규화 카운터 : 목록/상세에서 COUNT 쿼리 없이 사용 (articles/signals.py에서 F()로 갱신)
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    counter_fields = ('like_count', 'comment_count')
+
+    class Meta:
+        indexes = [
+            # explore(인기 작성자 글), timeline backfill, 프로필 글 목록 : user로 거르고 -id로 정렬
+            models.Index(fields=['user', '-id'], name='article_user_id_idx'),
+        ]
+
     def __str__(self):
         return f'{self.id} : {self.title}'
 
@@ -57,6 +75,57 @@ class Comment(models.Model):
     # 3. SET_NULL : 글이 삭제되면 NULL로 치환(NOT NULL일 경우 옵션 사용X)
     # 4. SET_DEFAULT : 디폴트 값으로 치환.
 
+    class Meta:
+        indexes = [
+            # 상세 페이지 댓글 keyset 페이지네이션 : article로 거르고 id 순서
+            models.Index(fields=['article', 'id'], name='comment_article_id_idx'),
+            # 프로필 댓글 목록 : user로 거르고 -id로 정렬
+            models.Index(fields=['user', '-id'], name='comment_user_id_idx'),
+        ]
+
+
+class MediaBlob(models.Model):
+    # blob_storage에 저장된 파일을 몇 개의 Article이 쓰고 있는지 (0이 되면 파일 삭제)
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name} ({self.ref_count})'
+
+
+class TimelineEntry(models.Model):
+    # explore용 home timeline (fan-out-on-write)
+    # 글이 작성될 때 작성자 본인과 팔로워들의 timeline에 미리 펼쳐 둔다.
+    # (owner, article) unique index 하나로 owner별 -article_id 범위 조회가 가능하다.
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='timeline_entries')
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='timeline_entries')
+
+    class Meta:
+        unique_together = ('owner', 'article')
+
+
+class HashTagBucket(models.Model):
+    # 날짜별(글 작성일 기준) 태그 사용 수 : 인기 태그 집계의 원본 (articles/trending.py)
+    hashtag = models.ForeignKey(HashTag, on_delete=models.CASCADE, related_name='buckets')
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('hashtag', 'day')
+
+
+class HashTagTrend(models.Model):
+    # 기간(window)별 태그 사용 수 : 인기 태그 위젯은 (window, -count) index 한 번만 읽는다.
+    hashtag = models.ForeignKey(HashTag, on_delete=models.CASCADE, related_name='trends')
+    window = models.CharField(max_length=10)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('window', 'hashtag')
+        indexes = [
+            models.Index(fields=['window', '-count'], name='hashtagtrend_rank_idx'),
+        ]
+
 
 # models.py : python 클래스 정의
 #           : 모델 설계도
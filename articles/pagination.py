@@ -0,0 +1,46 @@
+import base64
+import binascii
+
+from django.conf import settings
+
+
+# keyset(cursor) 페이지네이션
+# OFFSET 대신 마지막으로 본 id보다 작은 글만 가져오기 때문에
+# 테이블이 커져도 페이지마다 읽는 row 수가 일정하다.
+
+# DB integer 범위를 넘는 값은 쿼리에서 OverflowError가 나므로 잘못된 토큰으로 본다.
+MAX_CURSOR = 2 ** 63 - 1
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(str(value).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    # 잘못된 토큰은 첫 페이지로 취급
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not 0 <= value <= MAX_CURSOR:
+        return None
+    return value
+
+
+def paginate(queryset, cursor=None, page_size=None, key='id', descending=True):
+    """`-key`(descending=False면 `key`) 순서로 한 페이지와 다음 페이지 커서를 돌려준다."""
+    page_size = page_size or settings.ARTICLES_PAGE_SIZE
+    last_id = decode_cursor(cursor)
+    if last_id is not None:
+        lookup = 'lt' if descending else 'gt'
+        queryset = queryset.filter(**{f'{key}__{lookup}': last_id})
+    # 한 개 더 읽어서 다음 페이지가 있는지 확인
+    ordering = f'-{key}' if descending else key
+    items = list(queryset.order_by(ordering)[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(getattr(items[-1], key))
+    return items, next_cursor
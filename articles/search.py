@@ -0,0 +1,184 @@
+import re
+
+from django.conf import settings
+from django.db import connections, router
+
+from .models import Article, Comment
+from .pagination import decode_cursor, encode_cursor
+
+# 글/댓글 전문 검색 (articles_search)
+# - SQLite : FTS5 virtual table, bm25() 순위
+# - PostgreSQL : tsvector + GIN index, ts_rank_cd() 순위 (PostgreSQL에는 BM25가 없다.)
+# 글은 rowid = article.id, 댓글은 rowid = -comment.id 인 row 하나씩이라
+# 글/댓글이 바뀌면 그 row만 다시 쓴다. (articles/signals.py)
+# 검색은 row 단위로 점수를 매기고 article_id별 가장 좋은 점수로 묶는다.
+
+TABLE = 'articles_search'
+# title, body 가중치 (bm25는 column 순서대로, 점수가 낮을수록 관련도 높음)
+TITLE_WEIGHT, BODY_WEIGHT = 5.0, 1.0
+WORD_RE = re.compile(r'\w+')
+
+CREATE_SQL = {
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE {TABLE} USING fts5(title, body, article_id UNINDEXED, tokenize='unicode61')",
+    ],
+    'postgresql': [
+        f'CREATE TABLE {TABLE} (id bigint PRIMARY KEY, article_id integer NOT NULL, document tsvector NOT NULL)',
+        f'CREATE INDEX {TABLE}_document_idx ON {TABLE} USING GIN (document)',
+        f'CREATE INDEX {TABLE}_article_idx ON {TABLE} (article_id)',
+    ],
+}
+
+UPSERT_SQL = {
+    'sqlite': [
+        f'DELETE FROM {TABLE} WHERE rowid = %s',
+        f'INSERT INTO {TABLE} (rowid, title, body, article_id) VALUES (%s, %s, %s, %s)',
+    ],
+    'postgresql': [
+        f"INSERT INTO {TABLE} (id, article_id, document) VALUES (%s, %s, "
+        f"setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+        f"ON CONFLICT (id) DO UPDATE SET article_id = EXCLUDED.article_id, document = EXCLUDED.document",
+    ],
+}
+
+DELETE_SQL = {
+    'sqlite': f'DELETE FROM {TABLE} WHERE rowid = %s',
+    'postgresql': f'DELETE FROM {TABLE} WHERE id = %s',
+}
+
+SEARCH_SQL = {
+    'sqlite': (
+        # rank column : `rank MATCH 'bm25(...)'`로 정한 가중치의 bm25() 점수 (aggregate 안에서도 사용 가능)
+        f'SELECT article_id, MIN(rank) AS score FROM {TABLE} '
+        f"WHERE {TABLE} MATCH %s AND rank MATCH 'bm25({TITLE_WEIGHT}, {BODY_WEIGHT})' "
+        f'GROUP BY article_id ORDER BY score, article_id DESC LIMIT %s OFFSET %s'
+    ),
+    'postgresql': (
+        f"SELECT article_id, MAX(ts_rank_cd('{{0.1, 0.2, 0.4, 1.0}}', document, query)) AS score "
+        f"FROM {TABLE}, to_tsquery('simple', %s) query "
+        f'WHERE document @@ query GROUP BY article_id ORDER BY score DESC, article_id DESC LIMIT %s OFFSET %s'
+    ),
+}
+
+
+def is_supported(connection):
+    return connection.vendor in CREATE_SQL
+
+
+def create_table(connection):
+    if is_supported(connection):
+        with connection.cursor() as cursor:
+            for sql in CREATE_SQL[connection.vendor]:
+                cursor.execute(sql)
+
+
+def drop_table(connection):
+    if is_supported(connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE {TABLE}')
+
+
+def _rows(rows, connection):
+    """(rowid, title, body, article_id) -> vendor별 UPSERT 파라미터"""
+    if connection.vendor == 'sqlite':
+        return [[(rowid,), (rowid, title, body, article_id)] for rowid, title, body, article_id in rows]
+    return [[(rowid, article_id, title, body)] for rowid, title, body, article_id in rows]
+
+
+def write_rows(rows, using=None):
+    connection = connections[using or router.db_for_write(Article)]
+    if not is_supported(connection) or not rows:
+        return
+    statements = UPSERT_SQL[connection.vendor]
+    params = _rows(rows, connection)
+    with connection.cursor() as cursor:
+        for i, sql in enumerate(statements):
+            cursor.executemany(sql, [param[i] for param in params])
+
+
+def delete_row(rowid, using=None):
+    connection = connections[using or router.db_for_write(Article)]
+    if is_supported(connection):
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_SQL[connection.vendor], [rowid])
+
+
+def index_article(article):
+    write_rows([(article.pk, article.title, article.content, article.pk)])
+
+
+def index_comment(comment):
+    write_rows([(-comment.pk, '', comment.content, comment.article_id)])
+
+
+def unindex_article(article_pk):
+    # 댓글 row는 CASCADE로 지워지는 Comment의 post_delete에서 각각 지운다.
+    delete_row(article_pk)
+
+
+def unindex_comment(comment_pk):
+    delete_row(-comment_pk)
+
+
+def build_query(text, vendor):
+    # 사용자가 입력한 문법은 쓰지 않고 단어만 뽑아서 모든 단어의 접두어 검색(AND)
+    words = WORD_RE.findall(text)[:settings.SEARCH_MAX_TERMS]
+    if not words:
+        return None
+    if vendor == 'sqlite':
+        return ' '.join(f'"{word}"*' for word in words)
+    return ' & '.join(f'{word}:*' for word in words)
+
+
+def search(text, cursor=None, page_size=None):
+    """관련도 순으로 글 한 페이지(작성자 join)와 다음 페이지 커서를 돌려준다.
+
+    점수 순서라 keyset을 쓸 수 없으므로 커서는 offset이고 SEARCH_MAX_RESULTS까지만 넘길 수 있다.
+    """
+    page_size = page_size or settings.ARTICLES_PAGE_SIZE
+    offset = decode_cursor(cursor) or 0
+    using = router.db_for_read(Article)
+    connection = connections[using]
+    query = build_query(text, connection.vendor)
+    if not is_supported(connection) or query is None or offset >= settings.SEARCH_MAX_RESULTS:
+        return [], None
+    with connection.cursor() as db:
+        db.execute(SEARCH_SQL[connection.vendor], [query, page_size + 1, offset])
+        article_ids = [row[0] for row in db.fetchall()]
+    next_cursor = None
+    if len(article_ids) > page_size:
+        article_ids = article_ids[:page_size]
+        if offset + page_size < settings.SEARCH_MAX_RESULTS:
+            next_cursor = encode_cursor(offset + page_size)
+    articles = Article.objects.using(using).select_related('user').only(
+        'id', 'title', 'created_at', 'user', 'user__username',
+    ).in_bulk(article_ids)
+    return [articles[pk] for pk in article_ids if pk in articles], next_cursor
+
+
+def rebuild(batch_size=1000, using=None):
+    """검색 index를 비우고 모든 글/댓글을 batch_size개씩 다시 넣는다. 넣은 (글 수, 댓글 수)를 돌려준다."""
+    using = using or router.db_for_write(Article)
+    connection = connections[using]
+    if not is_supported(connection):
+        return 0, 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+    counts = []
+    for queryset, to_row in (
+        (Article.objects.using(using).values_list('id', 'title', 'content'),
+         lambda row: (row[0], row[1], row[2], row[0])),
+        (Comment.objects.using(using).values_list('id', 'content', 'article_id'),
+         lambda row: (-row[0], '', row[1], row[2])),
+    ):
+        # id keyset으로 batch_size개씩
+        total, last_id = 0, 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                break
+            write_rows([to_row(row) for row in batch], using)
+            total += len(batch)
+            last_id = batch[-1][0]
+        counts.append(total)
+    return tuple(counts)
@@ -0,0 +1,226 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from crud.counters import adjust
+
+from . import cache, hashtags, search, storage, timeline, trending
+from .images import schedule_variants
+from .models import Article, Comment
+
+
+@receiver(post_save, sender=Article)
+def fan_out_article(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Article)
+def link_hashtags(sender, instance, created, update_fields, **kwargs):
+    # view, admin 어디서 저장하든 해시태그와 content_html을 content에 맞춘다.
+    # content가 바뀌지 않은 저장(좋아요 수, 이미지 등)은 건너뛴다.
+    previous = instance.__dict__.pop('_previous_content', None)
+    if update_fields is not None and 'content' not in update_fields:
+        return
+    if not created and previous == instance.content:
+        return
+    added, removed = hashtags.sync_hashtags(instance)
+    trending.record(instance, added, removed)
+
+
+@receiver(pre_delete, sender=Article)
+def uncount_hashtags(sender, instance, **kwargs):
+    # through row는 CASCADE로 지워지므로 지워지기 전에 인기 태그 집계에서 뺀다.
+    tag_ids = Article.hashtags.through.objects.filter(article_id=instance.pk).values_list('hashtag_id', flat=True)
+    trending.record(instance, removed=set(tag_ids))
+
+
+@receiver(pre_save, sender=Article)
+def remember_previous(sender, instance, **kwargs):
+    # 저장 전 image, content를 한 번에 읽어 둔다. (이미지 참조 수, 해시태그 동기화에서 비교)
+    if instance._state.adding:
+        instance._previous_image = ''
+        return
+    fields = [field for field in ('image', 'content') if field not in instance.get_deferred_fields()]
+    if not fields:
+        return
+    previous = Article.objects.filter(pk=instance.pk).values(*fields).first() or {}
+    if 'image' in fields:
+        instance._previous_image = previous.get('image') or ''
+    if 'content' in fields:
+        instance._previous_content = previous.get('content')
+
+
+@receiver(post_save, sender=Article)
+def count_image_references(sender, instance, **kwargs):
+    if not hasattr(instance, '_previous_image'):
+        return
+    previous, current = instance.__dict__.pop('_previous_image'), instance.image.name or ''
+    if previous != current:
+        storage.retain(current)
+        storage.release(previous)
+
+
+@receiver(post_delete, sender=Article)
+def release_image(sender, instance, **kwargs):
+    storage.release(instance.image.name)
+
+
+@receiver(post_save, sender=Article)
+def generate_image_variants(sender, instance, **kwargs):
+    # 이미 있거나 예약된 variant는 backend에서 건너뛴다.
+    if instance.image:
+        schedule_variants(instance.image)
+
+
+@receiver(post_save, sender=Article)
+def invalidate_article_cache(sender, instance, **kwargs):
+    cache.invalidate_article(instance.pk)
+
+
+@receiver(post_delete, sender=Article)
+def forget_article_cache(sender, instance, **kwargs):
+    cache.forget_article(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_article_cache(sender, instance, **kwargs):
+    cache.invalidate_article(instance.article_id)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_create(sender, instance, created, **kwargs):
+    if created:
+        adjust(Article, [instance.article_id], 'comment_count', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_delete(sender, instance, **kwargs):
+    adjust(Article, [instance.article_id], 'comment_count', -1)
+
+
+@receiver(m2m_changed, sender=Article.like_users.through)
+def count_likes(sender, instance, action, reverse, pk_set, **kwargs):
+    # article.like_users.add(user) -> reverse=False, instance=article, pk_set={user}
+    # user.like_articles.add(article) -> reverse=True, instance=user, pk_set={article}
+    Like = sender
+    if action == 'pre_remove':
+        # remove()는 실제로 없는 pk도 그대로 넘겨주므로 존재하는 것만 남긴다.
+        # (post_remove에도 같은 set 객체가 전달된다.)
+        if reverse:
+            existing = Like.objects.filter(user_id=instance.pk, article_id__in=pk_set).values_list('article_id', flat=True)
+        else:
+            existing = Like.objects.filter(article_id=instance.pk, user_id__in=pk_set).values_list('user_id', flat=True)
+        pk_set.intersection_update(existing)
+        return
+    if action == 'pre_clear':
+        if reverse:
+            article_ids = list(instance.like_articles.values_list('pk', flat=True))
+            adjust(Article, article_ids, 'like_count', -1)
+        else:
+            article_ids = [instance.pk]
+            Article.objects.filter(pk=instance.pk).update(like_count=0)
+        for article_id in article_ids:
+            cache.invalidate_article(article_id)
+        return
+    if action not in ('post_add', 'post_remove'):
+        return
+    delta = 1 if action == 'post_add' else -1
+    if reverse:
+        adjust(Article, pk_set, 'like_count', delta)
+        for article_id in pk_set:
+            cache.invalidate_article(article_id)
+    else:
+        adjust(Article, [instance.pk], 'like_count', delta * len(pk_set))
+        cache.invalidate_article(instance.pk)
+
+
+@receiver(pre_save, sender=get_user_model())
+def remember_previous_username(sender, instance, update_fields=None, **kwargs):
+    # 로그인(last_login)처럼 username을 저장하지 않는 경우는 조회하지 않는다.
+    if instance._state.adding or (update_fields is not None and 'username' not in update_fields):
+        return
+    instance._previous_username = sender.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_renamed_user_articles(sender, instance, **kwargs):
+    # 상세 페이지 fragment에 작성자/댓글 작성자 username이 들어 있다.
+    previous = instance.__dict__.pop('_previous_username', None)
+    if previous is None or previous == instance.username:
+        return
+    article_ids = set(Article.objects.filter(user_id=instance.pk).values_list('pk', flat=True))
+    article_ids.update(Comment.objects.filter(user_id=instance.pk).values_list('article_id', flat=True))
+    for article_id in article_ids:
+        cache.invalidate_article(article_id)
+
+
+@receiver(pre_delete, sender=get_user_model())
+def uncount_deleted_user_likes(sender, instance, **kwargs):
+    # 사용자를 지우면 좋아요/follow row는 CASCADE로 지워지고 m2m_changed가 오지 않는다.
+    article_ids = list(Article.like_users.through.objects.filter(user_id=instance.pk).values_list('article_id', flat=True))
+    adjust(Article, article_ids, 'like_count', -1)
+    for article_id in article_ids:
+        cache.invalidate_article(article_id)
+    # 팔로워가 줄어 인기 작성자에서 내려오는 작성자는 follow row가 지워진 뒤(post_delete) refill
+    instance._followed_author_ids = list(instance.followings.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=get_user_model())
+def refill_after_user_delete(sender, instance, **kwargs):
+    author_ids = instance.__dict__.pop('_followed_author_ids', None)
+    if author_ids:
+        timeline.refill_unpopular(author_ids, 1)
+
+
+def _follow_groups(instance, reverse, pk_set):
+    # follower_id -> 팔로우한(취소한) author_id 목록
+    # obama.followers.add(me)  -> reverse=False, instance=obama, pk_set={me}
+    # me.followings.add(obama) -> reverse=True,  instance=me,    pk_set={obama}
+    if reverse:
+        return {instance.pk: list(pk_set)} if pk_set else {}
+    return {pk: [instance.pk] for pk in pk_set}
+
+
+@receiver(m2m_changed, sender=get_user_model().followers.through)
+def sync_timeline_on_follow(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # clear는 post_clear에서 pk_set을 주지 않기 때문에 미리 기억해 둔다.
+        related = instance.followings if reverse else instance.followers
+        instance._cleared_follow_pks = set(related.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        action, pk_set = 'post_remove', instance.__dict__.pop('_cleared_follow_pks', set())
+
+    if action == 'post_add':
+        for follower_id, author_ids in _follow_groups(instance, reverse, pk_set).items():
+            timeline.backfill(follower_id, author_ids)
+    elif action == 'post_remove':
+        for follower_id, author_ids in _follow_groups(instance, reverse, pk_set).items():
+            timeline.prune(follower_id, author_ids)
+        # author마다 잃은 팔로워 수 : me.followings.remove(...)는 1명, obama.followers.remove(...)는 len(pk_set)명
+        if reverse:
+            timeline.refill_unpopular(pk_set, 1)
+        elif pk_set:
+            timeline.refill_unpopular([instance.pk], len(pk_set))
+
+
+@receiver(post_save, sender=Article)
+def index_article(sender, instance, **kwargs):
+    search.index_article(instance)
+
+
+@receiver(post_delete, sender=Article)
+def unindex_article(sender, instance, **kwargs):
+    search.unindex_article(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    search.index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    search.unindex_comment(instance.pk)
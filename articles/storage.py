@@ -0,0 +1,137 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+# 내용 주소(content-addressed) 저장소
+# 업로드 파일을 chunk 단위로 읽으면서 sha256을 계산하고 blobs/ab/cd/<sha256>.<ext> 에 한 번만 저장한다.
+# 같은 이미지를 여러 번 올려도 파일은 하나이고, imagekit 썸네일도 원본 경로(=digest) 기준이라 함께 공유된다.
+# 몇 개의 Article이 같은 파일을 쓰는지는 MediaBlob.ref_count로 관리한다.
+
+BLOB_DIR = 'blobs'
+CHUNK_SIZE = 64 * 1024
+
+
+def blob_name(digest, ext):
+    return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}'
+
+
+def file_digest(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # 실제 이름은 _save에서 내용의 digest로 정해지므로 suffix를 붙이지 않는다.
+        return name
+
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1]
+        if hasattr(content, 'temporary_file_path'):
+            # 디스크에 있는 업로드 파일 : digest만 계산하고 rename으로 옮긴다.
+            source = content.temporary_file_path()
+            digest = getattr(content, 'sha256', None) or file_digest(source)
+            owned = False
+        else:
+            # 메모리에 있는 파일 : 임시 파일에 쓰면서 digest 계산
+            source, digest = self._spool(content)
+            owned = True
+
+        name = blob_name(digest, ext)
+        full_path = self.path(name)
+        # row가 없으면 delete_unused_blob이 row를 지우고 파일을 unlink하는 중일 수 있다.
+        # 내용이 같으므로 그때는 파일을 다시 써 둔다. (rename이라 읽는 쪽은 깨지지 않는다.)
+        if os.path.exists(full_path) and blob_exists(name):
+            if owned:
+                os.remove(source)
+            return name
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if owned:
+            os.replace(source, full_path)
+        else:
+            file_move_safe(source, full_path, allow_overwrite=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+    def temp_dir(self):
+        # 최종 위치와 같은 파일시스템 -> 임시 파일을 rename만으로 옮길 수 있다.
+        directory = self.path(os.path.join(BLOB_DIR, 'tmp'))
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def _spool(self, content):
+        hasher = hashlib.sha256()
+        fd, path = tempfile.mkstemp(dir=self.temp_dir())
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks(CHUNK_SIZE):
+                    hasher.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, hasher.hexdigest()
+
+    def delete_derived(self, name):
+        # imagekit 썸네일/variant (CACHE/images/<원본 경로 확장자 제외>/)
+        from django.conf import settings
+        directory = self.path(os.path.join(settings.IMAGEKIT_CACHEFILE_DIR, os.path.splitext(name)[0]))
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+blob_storage = ContentAddressedStorage()
+
+
+def blob_exists(name):
+    from .models import MediaBlob
+    return MediaBlob.objects.filter(name=name).exists()
+
+
+def retain(name):
+    # row가 이미 지워졌으면 다시 만든다. (파일은 _save에서 다시 쓴다.)
+    from .models import MediaBlob
+    if not name:
+        return
+    MediaBlob.objects.get_or_create(name=name)
+    MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+
+def release(name):
+    """참조를 하나 줄이고, 더 이상 쓰는 Article이 없으면 commit 후 파일을 지운다."""
+    from .models import MediaBlob
+    if not name:
+        return
+    MediaBlob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+    if MediaBlob.objects.filter(name=name, ref_count__lte=0).exists():
+        transaction.on_commit(lambda: delete_unused_blob(name))
+
+
+def delete_unused_blob(name):
+    """참조가 0인 blob row와 파일을 지운다.
+
+    release와 commit 사이에 같은 파일을 다시 올린 Article이 retain했을 수 있으므로
+    ref_count가 0인 row만 조건부 DELETE로 지우고, 실제로 지운 경우에만 파일을 unlink한다.
+    (row를 먼저 지우므로 그 사이에 같은 파일을 저장하면 _save가 파일을 다시 쓴다.)
+    """
+    from .models import MediaBlob
+    with transaction.atomic():
+        deleted, _ = MediaBlob.objects.filter(name=name, ref_count=0).delete()
+        if not deleted:
+            return False
+        blob_storage.delete(name)
+        blob_storage.delete_derived(name)
+    return True
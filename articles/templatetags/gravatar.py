@@ -1,12 +1,10 @@
 from django import template
-import hashlib
+
+from accounts.avatars import gravatar_url
 
 register = template.Library()
 
 @register.filter
 def makehash(user):
-    email = user.email
-    social_user = user.socialaccount_set.all().first()
-    if social_user:
-        return social_user.extra_data.get('properties').get('profile_image')
-    return 'https://www.gravatar.com/avatar/' + hashlib.md5(email.strip().lower().encode('utf-8')).hexdigest()
\ No newline at end of file
+    # User.avatar_url에 미리 계산해 둔 값 (accounts/avatars.py) : 쿼리 없음
+    return user.avatar_url or gravatar_url(user.email)
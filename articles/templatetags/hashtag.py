@@ -1,12 +1,11 @@
 from django import template
-import re
 register = template.Library()
 
 @register.filter
 def make_link(article):
-    content = article.content + ' '
-    hashtags = article.hashtags.all()
-
-    for hashtag in hashtags:
-        content = content.replace(hashtag.content+' ', f'<a href="/hashtags/{hashtag.pk}/"> {hashtag.content}</a>')
-    return content
\ No newline at end of file
+    # 저장할 때 미리 만들어 둔 content_html 사용 (articles/hashtags.py)
+    if not article.content_html and article.content:
+        from articles.hashtags import render_content
+        tag_ids = dict(article.hashtags.values_list('content', 'id'))
+        return render_content(article.content, tag_ids)
+    return article.content_html
@@ -0,0 +1,39 @@
+from django import template
+from django.templatetags.static import static
+
+from articles.thumbnails import is_ready
+
+register = template.Library()
+
+@register.filter
+def thumbnail_url(image_file):
+    # 썸네일이 아직 없으면 작업을 예약하고 placeholder를 보여준다.
+    if is_ready(image_file):
+        return image_file.url
+    image_file.generate()
+    return static('articles/thumbnail-placeholder.svg')
+
+
+@register.inclusion_tag('articles/_responsive_image.html')
+def responsive_image(image, sizes='100vw', alt=''):
+    # 준비된 variant만 srcset에 넣는다.
+    # <img>는 <picture>를 모르는 브라우저도 읽으므로 JPEG variant나 원본만 쓴다.
+    from articles.images import CONTENT_TYPES, FALLBACK_FORMAT, image_variants
+    sources = []
+    fallback = None
+    for format, variants in image_variants(image).items():
+        ready = [f'{variant.url} {width}w' for width, variant in variants if is_ready(variant)]
+        if not ready:
+            continue
+        source = {'type': CONTENT_TYPES.get(format, ''), 'srcset': ', '.join(ready)}
+        if format == FALLBACK_FORMAT:
+            fallback = source
+        else:
+            sources.append(source)
+    return {
+        'image': image,
+        'sources': sources,
+        'fallback': fallback,
+        'sizes': sizes,
+        'alt': alt or image.name,
+    }
@@ -0,0 +1,11 @@
+from django import template
+
+from articles.trending import top_tags
+
+register = template.Library()
+
+
+@register.inclusion_tag('articles/_trending_tags.html')
+def trending_tags(window='day'):
+    # (window, -count) index 한 번 읽기
+    return {'trends': top_tags(window)}
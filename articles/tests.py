@@ -1,3 +1,557 @@
-from django.test import TestCase
+import base64
+import datetime
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from PIL import Image
+
+from accounts.models import User
+
+from . import cache, likes, search as search_index, storage, timeline, trending
+from .models import Article, Comment, HashTagBucket, HashTagTrend, MediaBlob, TimelineEntry
+from .pagination import decode_cursor, encode_cursor, paginate
+from .storage import blob_storage
+from .templatetags.thumbnail import responsive_image
+from .thumbnails import ThreadPoolBackend, generate_file
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(str(value).encode()).decode().rstrip('=')
+
+
+def image_file(name='image.png', format='PNG', size=(40, 30), color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{format.lower()}')
+
+
+class MediaTestCase(TestCase):
+    # 업로드/썸네일 파일은 임시 MEDIA_ROOT에 만들고 끝나면 지운다.
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_settings = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
 
 # Create your tests here.
+class CursorTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('author', password='pw')
+        self.articles = [Article.objects.create(title=f'글{i}', content='내용', user=user) for i in range(3)]
+
+    def test_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(42)), 42)
+
+    def test_invalid_cursor_is_first_page(self):
+        for token in ('', 'not base64!', raw_cursor('abc'), raw_cursor(-1), raw_cursor(2 ** 63), raw_cursor('9' * 20)):
+            self.assertIsNone(decode_cursor(token))
+
+    def test_out_of_range_cursor_does_not_fail(self):
+        response = self.client.get(reverse('articles:index'), {'before': raw_cursor('9' * 20)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['articles']), 3)
+
+    def test_next_page(self):
+        first, cursor = paginate(Article.objects.all(), page_size=2)
+        second, next_cursor = paginate(Article.objects.all(), cursor, page_size=2)
+        self.assertEqual([a.pk for a in first + second], [a.pk for a in reversed(self.articles)])
+        self.assertIsNone(next_cursor)
+
+
+@override_settings(TIMELINE_FANOUT_LIMIT=2, TIMELINE_BACKFILL_SIZE=5)
+class TimelinePopularityTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='pw')
+        self.followers = [User.objects.create_user(f'follower{i}', password='pw') for i in range(3)]
+        self.author.followers.add(*self.followers)
+
+    def explore_ids(self, user):
+        return [article.pk for article in timeline.home_timeline(user)[0]]
+
+    def test_popular_author_is_merged_on_read(self):
+        article = Article.objects.create(title='인기', content='내용', user=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(owner=self.followers[0], article=article).exists())
+        self.assertEqual(self.explore_ids(self.followers[0]), [article.pk])
+
+    def test_articles_stay_visible_after_dropping_under_limit(self):
+        articles = [Article.objects.create(title=f'글{i}', content='내용', user=self.author) for i in range(7)]
+        self.followers[2].followings.remove(self.author)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.follower_count, 2)
+        # 최근 TIMELINE_BACKFILL_SIZE개는 펼쳐져 있다.
+        self.assertEqual(self.explore_ids(self.followers[0]), [article.pk for article in reversed(articles)][:5])
+        self.assertEqual(self.explore_ids(self.followers[2]), [])
+
+    def test_follow_backfills_recent_articles(self):
+        other = User.objects.create_user('other', password='pw')
+        articles = [Article.objects.create(title=f'글{i}', content='내용', user=other) for i in range(7)]
+        Article.objects.create(title='인기', content='내용', user=self.author)
+        newcomer = User.objects.create_user('newcomer', password='pw')
+        newcomer.followings.add(other, self.author)
+        # 인기 작성자는 제외하고 author마다 최근 TIMELINE_BACKFILL_SIZE개
+        entries = TimelineEntry.objects.filter(owner=newcomer).order_by('-article_id').values_list('article_id', flat=True)
+        self.assertEqual(list(entries), [article.pk for article in reversed(articles)][:5])
+
+    def test_followers_remove_refills(self):
+        article = Article.objects.create(title='글', content='내용', user=self.author)
+        self.author.followers.remove(self.followers[0], self.followers[1])
+        self.assertEqual(self.explore_ids(self.followers[2]), [article.pk])
+
+
+@override_settings(TIMELINE_FANOUT_LIMIT=2, TIMELINE_BACKFILL_SIZE=2)
+class TimelineRebuildTest(TestCase):
+    def setUp(self):
+        self.author, self.other, self.follower = [User.objects.create_user(f'user{i}', password='pw') for i in range(3)]
+        self.author.followers.add(self.follower)
+        self.other.followers.add(self.follower)
+        self.articles = [Article.objects.create(title=f'글{i}', content='내용', user=self.author) for i in range(4)]
+        self.other_article = Article.objects.create(title='다른 글', content='내용', user=self.other)
+
+    def entries(self, owner):
+        return set(TimelineEntry.objects.filter(owner=owner).values_list('article_id', flat=True))
+
+    def test_followers_get_recent_articles(self):
+        TimelineEntry.objects.all().delete()
+        timeline.rebuild()
+        self.assertEqual(self.entries(self.author), {article.pk for article in self.articles})
+        self.assertEqual(self.entries(self.follower), {self.articles[-1].pk, self.articles[-2].pk, self.other_article.pk})
+
+    def test_rebuild_only_given_authors(self):
+        TimelineEntry.objects.filter(article__user=self.author).delete()
+        timeline.rebuild(User.objects.filter(pk=self.author.pk))
+        self.assertEqual(self.entries(self.follower), {self.articles[-1].pk, self.articles[-2].pk, self.other_article.pk})
+        # 다른 작성자의 entry는 지우지 않는다.
+        self.assertEqual(self.entries(self.other), {self.other_article.pk})
+
+
+class HashTagSyncTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('author', password='pw')
+        self.article = Article.objects.create(title='글', content='#장고 #파이썬', user=self.user)
+
+    def tags(self):
+        return set(self.article.hashtags.values_list('content', flat=True))
+
+    def test_content_change_syncs_hashtags(self):
+        self.article.content = '#장고 #테스트'
+        self.article.save()
+        self.assertEqual(self.tags(), {'#장고', '#테스트'})
+        self.assertIn('/hashtags/', Article.objects.get(pk=self.article.pk).content_html)
+
+    def test_unchanged_content_skips_sync(self):
+        with mock.patch('articles.hashtags.sync_hashtags') as sync:
+            self.article.title = '제목만 수정'
+            self.article.save()
+            Article.objects.get(pk=self.article.pk).save(update_fields=['title'])
+        sync.assert_not_called()
+
+    def post(self, url, tags, queries):
+        content = ' '.join(f'#{tag}' for tag in tags)
+        with self.assertNumQueries(queries):
+            response = self.client.post(url, {'title': '글', 'content': content})
+        self.assertEqual(response.status_code, 302)
+
+    def test_query_count_does_not_grow_with_tags(self):
+        self.client.force_login(self.user)
+        # 태그 수와 관계없이 작성 23번, 수정 29번 (세션/사용자, timeline, trending, 검색 색인 포함)
+        for tag_count in (1, 50):
+            tags = [f'태그{tag_count}-{i}' for i in range(tag_count)]
+            self.post(reverse('articles:create'), tags, 23)
+            self.post(reverse('articles:update', args=[self.article.pk]), tags, 29)
+        self.assertEqual(len(self.tags()), 50)
+
+
+class TrendingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('author', password='pw')
+        self.today = timezone.localdate()
+
+    def create(self, content):
+        return Article.objects.create(title='글', content=content, user=self.user)
+
+    def counts(self, window='day'):
+        return dict(
+            HashTagTrend.objects.filter(window=window, count__gt=0).values_list('hashtag__content', 'count')
+        )
+
+    def test_record_is_incremental(self):
+        article = self.create('#장고 #파이썬')
+        self.create('#장고')
+        self.assertEqual(self.counts(), {'#장고': 2, '#파이썬': 1})
+        article.content = '#파이썬 #테스트'
+        article.save()
+        self.assertEqual(self.counts(), {'#장고': 1, '#파이썬': 1, '#테스트': 1})
+        self.assertEqual(self.counts('week'), self.counts())
+
+    def test_delete_decrements(self):
+        article = self.create('#장고 #파이썬')
+        self.create('#장고')
+        article.delete()
+        self.assertEqual(self.counts(), {'#장고': 1})
+        self.assertEqual(
+            dict(HashTagBucket.objects.filter(count__gt=0).values_list('hashtag__content', 'count')), {'#장고': 1},
+        )
+
+    def test_roll_expires_old_days(self):
+        self.create('#장고')
+        trending.roll(self.today + datetime.timedelta(days=1))
+        self.assertEqual(self.counts(), {})
+        self.assertEqual(self.counts('week'), {'#장고': 1})
+        trending.roll(self.today + datetime.timedelta(days=7))
+        self.assertEqual(self.counts('week'), {})
+        self.assertFalse(HashTagBucket.objects.exists())
+
+    def test_recount_matches_incremental(self):
+        article = self.create('#장고 #파이썬')
+        self.create('#장고 #테스트')
+        self.create('#파이썬').delete()
+        article.content = '#장고 #리팩터링'
+        article.save()
+        incremental = {window: self.counts(window) for window in settings.TRENDING_WINDOWS}
+        trending.recount()
+        self.assertEqual({window: self.counts(window) for window in settings.TRENDING_WINDOWS}, incremental)
+
+    def test_top_tags(self):
+        self.create('#장고 #파이썬 #테스트')
+        self.create('#장고 #파이썬')
+        self.create('#장고')
+        tags = trending.top_tags(limit=2)
+        self.assertEqual([(trend.hashtag.content, trend.count) for trend in tags], [('#장고', 3), ('#파이썬', 2)])
+
+
+class ArticleCacheTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='pw')
+        self.commenter = User.objects.create_user('commenter', password='pw')
+        self.article = Article.objects.create(title='글', content='내용', user=self.author)
+        self.commented = Article.objects.create(title='글2', content='내용', user=self.author)
+        Comment.objects.create(article=self.commented, user=self.commenter, content='댓글')
+
+    def test_rename_invalidates_fragments(self):
+        versions = [cache.article_version(article.pk) for article in (self.article, self.commented)]
+        self.commenter.username = 'renamed'
+        self.commenter.save()
+        self.assertEqual(cache.article_version(self.article.pk), versions[0])
+        self.assertNotEqual(cache.article_version(self.commented.pk), versions[1])
+        self.author.username = 'renamed-author'
+        self.author.save()
+        self.assertNotEqual(cache.article_version(self.article.pk), versions[0])
+
+    def test_login_keeps_fragments(self):
+        version = cache.article_version(self.article.pk)
+        self.client.login(username='author', password='pw')
+        self.assertEqual(cache.article_version(self.article.pk), version)
+
+
+class LikeTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('fan', password='pw')
+        self.article = Article.objects.create(title='글', content='내용', user=self.user)
+
+    def test_toggle_like(self):
+        self.assertEqual(likes.toggle_like(self.article.pk, self.user.pk), (True, 1))
+        self.assertEqual(likes.toggle_like(self.article.pk, self.user.pk), (False, 0))
+        self.assertEqual(likes.toggle_like(self.article.pk, self.user.pk), (True, 1))
+
+    def test_unlike_at_zero(self):
+        # 카운터가 이미 0으로 어긋나 있어도 좋아요 취소는 CHECK 제약 위반 없이 끝난다.
+        likes.toggle_like(self.article.pk, self.user.pk)
+        Article.objects.filter(pk=self.article.pk).update(like_count=0)
+        self.assertEqual(likes.toggle_like(self.article.pk, self.user.pk), (False, 0))
+        self.assertFalse(self.article.like_users.exists())
+
+
+class CommentListTest(TestCase):
+    def test_missing_article_is_404(self):
+        response = self.client.get(reverse('articles:comment_list', args=[999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_comment_page(self):
+        user = User.objects.create_user('author', password='pw')
+        article = Article.objects.create(title='글', content='내용', user=user)
+        Comment.objects.create(article=article, user=user, content='댓글')
+        response = self.client.get(reverse('articles:comment_list', args=[article.pk]))
+        self.assertEqual([comment['content'] for comment in response.json()['comments']], ['댓글'])
+
+
+class ThumbnailTest(MediaTestCase):
+    def test_generate_file_opens_its_own_source(self):
+        user = User.objects.create_user('author', password='pw')
+        article = Article.objects.create(title='글', content='내용', user=user)
+        Article.objects.filter(pk=article.pk).update(image=blob_storage.save('image.png', image_file()))
+        article.refresh_from_db()
+        thumbnail = article.image_thumbnail
+        generate_file(thumbnail, force=True)
+        self.assertTrue(blob_storage.exists(thumbnail.name))
+        # 다른 job과 공유하는 Article.image는 열지 않는다.
+        self.assertIsNot(thumbnail.generator.source, article.image)
+        self.assertIsNone(article.image._file)
+
+
+class ResponsiveImageTest(MediaTestCase):
+    def setUp(self):
+        user = User.objects.create_user('author', password='pw')
+        article = Article.objects.create(title='글', content='내용', user=user)
+        Article.objects.filter(pk=article.pk).update(image=blob_storage.save('image.png', image_file()))
+        self.image = Article.objects.get(pk=article.pk).image
+
+    def render(self, ready_formats):
+        def is_ready(variant):
+            return variant.generator.format in ready_formats
+
+        with mock.patch('articles.templatetags.thumbnail.is_ready', is_ready):
+            return responsive_image(self.image)
+
+    def test_webp_only_falls_back_to_original(self):
+        context = self.render({'WEBP'})
+        self.assertIsNone(context['fallback'])
+        self.assertEqual([source['type'] for source in context['sources']], ['image/webp'])
+
+    def test_jpeg_is_img_fallback(self):
+        context = self.render({'WEBP', 'JPEG'})
+        self.assertEqual(context['fallback']['type'], 'image/jpeg')
+        self.assertEqual([source['type'] for source in context['sources']], ['image/webp'])
+
+
+@mock.patch.object(ThreadPoolBackend, 'schedule_generation')
+class MediaBlobTest(MediaTestCase):
+    # TestCase는 on_commit을 실행하지 않으므로 delete_unused_blob을 직접 부른다.
+    def setUp(self):
+        self.user = User.objects.create_user('author', password='pw')
+
+    def create(self):
+        return Article.objects.create(title='글', content='내용', user=self.user, image=image_file())
+
+    def test_same_image_is_stored_once(self, schedule):
+        first, second = self.create(), self.create()
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(MediaBlob.objects.get(name=first.image.name).ref_count, 2)
+
+    def test_release_deletes_unused_blob(self, schedule):
+        first, second = self.create(), self.create()
+        name = first.image.name
+        first.delete()
+        self.assertFalse(storage.delete_unused_blob(name))
+        self.assertTrue(blob_storage.exists(name))
+        second.delete()
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 0)
+        self.assertTrue(storage.delete_unused_blob(name))
+        self.assertFalse(blob_storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_reupload_before_commit_keeps_blob(self, schedule):
+        article = self.create()
+        name = article.image.name
+        article.delete()
+        # release 이후, commit callback 전에 같은 이미지를 다시 올린 경우
+        self.create()
+        self.assertFalse(storage.delete_unused_blob(name))
+        self.assertTrue(blob_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+
+    def test_missing_file_is_written_again(self, schedule):
+        name = self.create().image.name
+        os.remove(blob_storage.path(name))
+        self.create()
+        self.assertTrue(blob_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 2)
+
+    def test_missing_row_rewrites_file(self, schedule):
+        # delete_unused_blob이 row를 지운 뒤 파일을 unlink하기 전에 같은 이미지를 올린 경우
+        article = self.create()
+        name = article.image.name
+        article.delete()
+        MediaBlob.objects.filter(name=name).delete()
+        inode = os.stat(blob_storage.path(name)).st_ino
+        self.create()
+        self.assertNotEqual(os.stat(blob_storage.path(name)).st_ino, inode)
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+
+
+@mock.patch.object(ThreadPoolBackend, 'schedule_generation')
+class ImageUploadTest(MediaTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('author', password='pw')
+        self.client.force_login(self.user)
+
+    def post(self, url=None, **files):
+        return self.client.post(url or reverse('articles:create'), {'title': '글', 'content': '내용', **files})
+
+    def test_image_upload(self, schedule):
+        response = self.post(image=image_file())
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Article.objects.get().image.name.startswith('blobs/'))
+
+    def test_non_image_is_rejected(self, schedule):
+        response = self.post(image=SimpleUploadedFile('image.png', b'not an image' * 10, content_type='image/png'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('이미지 파일(JPEG, PNG, GIF, WEBP)만 올릴 수 있습니다.', response.context['article_form'].errors['image'])
+        self.assertFalse(Article.objects.exists())
+
+    @override_settings(ARTICLE_IMAGE_MAX_SIZE=100)
+    def test_oversize_image_is_rejected(self, schedule):
+        response = self.post(image=image_file(size=(400, 300)))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('이미지 파일이 너무 큽니다.', response.context['article_form'].errors['image'])
+        self.assertFalse(Article.objects.exists())
+
+    @override_settings(ARTICLE_IMAGE_MAX_SIZE=100)
+    def test_oversize_request_stops_upload(self, schedule):
+        with mock.patch('articles.uploadhandlers.FORM_OVERHEAD', 0):
+            response = self.post(image=image_file())
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Article.objects.exists())
+
+    def test_api_upload(self, schedule):
+        response = self.post(reverse('api:article_list'), image=image_file())
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Article.objects.get().image.name.startswith('blobs/'))
+
+    @override_settings(ARTICLE_IMAGE_MAX_SIZE=100)
+    def test_api_oversize_image_is_rejected(self, schedule):
+        response = self.post(reverse('api:article_list'), image=image_file(size=(400, 300)))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('이미지 파일이 너무 큽니다.', response.json()['errors']['image'])
+        self.assertFalse(Article.objects.exists())
+        # 업로드 중에 멈추는 경우도 HTML view와 같다.
+        with mock.patch('articles.uploadhandlers.FORM_OVERHEAD', 0):
+            response = self.post(reverse('api:article_list'), image=image_file())
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Article.objects.exists())
+
+    def test_other_file_fields_are_not_checked(self, schedule):
+        response = self.post(attachment=SimpleUploadedFile('notes.txt', b'plain text' * 10, content_type='text/plain'))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Article.objects.exists())
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('author', password='pw')
+        self.title_match = Article.objects.create(title='django tips', content='내용', user=self.user)
+        self.body_match = Article.objects.create(title='글', content='learning django today', user=self.user)
+        self.other = Article.objects.create(title='flask', content='다른 내용', user=self.user)
+
+    def ids(self, text, **kwargs):
+        return [article.pk for article in search_index.search(text, **kwargs)[0]]
+
+    def test_title_match_ranks_first(self):
+        self.assertEqual(self.ids('django'), [self.title_match.pk, self.body_match.pk])
+
+    def test_prefix_and_all_words(self):
+        self.assertEqual(self.ids('djan tod'), [self.body_match.pk])
+        self.assertEqual(self.ids('"; DROP'), [])
+
+    def test_update_delete_and_comments_are_indexed(self):
+        self.other.content = 'now about django'
+        self.other.save()
+        self.assertIn(self.other.pk, self.ids('django'))
+        self.body_match.delete()
+        self.assertNotIn(self.body_match.pk, self.ids('django'))
+        comment = Comment.objects.create(article=self.other, user=self.user, content='pytest fixtures')
+        self.assertEqual(self.ids('pytest'), [self.other.pk])
+        comment.delete()
+        self.assertEqual(self.ids('pytest'), [])
+
+    @override_settings(ARTICLES_PAGE_SIZE=1)
+    def test_pages(self):
+        articles, cursor = search_index.search('django')
+        self.assertEqual([article.pk for article in articles], [self.title_match.pk])
+        self.assertEqual(self.ids('django', cursor=cursor), [self.body_match.pk])
+
+    def test_rebuild(self):
+        self.assertEqual(search_index.rebuild(), (3, 0))
+        self.assertEqual(len(self.ids('django')), 2)
+
+
+class ApiTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='pw')
+        self.other = User.objects.create_user('other', password='pw')
+        self.articles = [Article.objects.create(title=f'글{i}', content=f'내용 #태그{i}', user=self.author) for i in range(3)]
+        self.article = self.articles[-1]
+        self.url = reverse('api:article_detail', args=[self.article.pk])
+
+    def patch(self, data, user=None, **extra):
+        if user is not None:
+            self.client.force_login(user)
+        return self.client.patch(self.url, data, content_type='application/json', **extra)
+
+    def test_fields(self):
+        response = self.client.get(self.url, {'fields': 'id,title,user'})
+        self.assertEqual(response.json(), {
+            'id': self.article.pk, 'title': '글2', 'user': {'id': self.author.pk, 'username': 'author'},
+        })
+        response = self.client.get(self.url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['fields'], ['password'])
+
+    def test_list_cursor(self):
+        url = reverse('api:article_list')
+        first = self.client.get(url, {'fields': 'id', 'limit': 2}).json()
+        self.assertEqual([article['id'] for article in first['articles']], [self.articles[2].pk, self.articles[1].pk])
+        second = self.client.get(url, {'fields': 'id', 'limit': 2, 'before': first['next_cursor']}).json()
+        self.assertEqual(second, {'articles': [{'id': self.articles[0].pk}], 'next_cursor': None})
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url).get('ETag')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.article.like_users.add(self.other)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_rename_changes_etag_with_user_field(self):
+        with_user = self.client.get(self.url, {'fields': 'id,user'}).get('ETag')
+        without_user = self.client.get(self.url, {'fields': 'id,title'}).get('ETag')
+        self.author.username = '작성자'
+        self.author.save()
+        response = self.client.get(self.url, {'fields': 'id,user'}, HTTP_IF_NONE_MATCH=with_user)
+        self.assertEqual(response.json()['user']['username'], '작성자')
+        self.assertEqual(self.client.get(self.url, {'fields': 'id,title'}, HTTP_IF_NONE_MATCH=without_user).status_code, 304)
+        # Last-Modified만 보내는 경우도 username을 요청하면 비교하지 않는다.
+        last_modified = self.client.get(self.url, {'fields': 'id,title'}).get('Last-Modified')
+        response = self.client.get(self.url, {'fields': 'id,user'}, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_match(self):
+        etag = self.client.get(self.url).get('ETag')
+        self.assertEqual(self.patch({'title': '수정'}, self.author, HTTP_IF_MATCH=etag).status_code, 200)
+        # 그 사이 바뀐 글
+        self.assertEqual(self.patch({'title': '다시'}, HTTP_IF_MATCH=etag).status_code, 412)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, '수정')
+
+    def test_permissions(self):
+        self.assertEqual(self.patch({'title': '수정'}).status_code, 401)
+        self.assertEqual(self.patch({'title': '수정'}, self.other).status_code, 403)
+        self.assertEqual(self.client.delete(self.url).status_code, 403)
+        self.assertTrue(Article.objects.filter(pk=self.article.pk).exists())
+
+    def test_patch_requires_json(self):
+        self.client.force_login(self.author)
+        response = self.client.patch(self.url, 'title=수정', content_type='application/x-www-form-urlencoded')
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(self.patch({'content': '새 내용 #새태그'}).json()['content'], '새 내용 #새태그')
+        self.assertEqual(list(self.article.hashtags.values_list('content', flat=True)), ['#새태그'])
+
+    def test_comment_list(self):
+        self.assertEqual(self.client.get(reverse('api:comment_list', args=[0])).status_code, 404)
+        Comment.objects.create(article=self.article, user=self.other, content='댓글')
+        response = self.client.get(reverse('api:comment_list', args=[self.article.pk]))
+        self.assertEqual([comment['content'] for comment in response.json()['comments']], ['댓글'])
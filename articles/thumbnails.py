@@ -0,0 +1,85 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from imagekit.cachefiles.backends import BaseAsync, CacheFileState
+
+logger = logging.getLogger(__name__)
+
+# imagekit 썸네일을 요청 안에서 만들지 않고 로컬 thread pool에서 미리 만든다.
+# settings.IMAGEKIT_DEFAULT_CACHEFILE_BACKEND = 'articles.thumbnails.ThreadPoolBackend'
+# settings.IMAGEKIT_DEFAULT_CACHEFILE_STRATEGY = 'imagekit.cachefiles.strategies.Optimistic'
+#   -> Article 저장(원본 이미지 변경) 시 작업 예약, .url 접근 시에는 만들지 않음
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS, thread_name_prefix='thumbnail',
+            )
+    return _executor
+
+
+def generate_file(file, force=False):
+    """file을 지금 만든다. 여러 thread가 같은 원본 FieldFile을 동시에 읽지 않도록 복사해서 연다."""
+    source = getattr(file.generator, 'source', None)
+    if not isinstance(source, FieldFile):
+        file.cachefile_backend.generate_now(file, force=force)
+        return
+    file.generator.source = source.field.attr_class(source.instance, source.field, source.name)
+    try:
+        file.cachefile_backend.generate_now(file, force=force)
+    finally:
+        file.generator.source.close()
+
+
+class ThreadPoolBackend(BaseAsync):
+    # 작업 중 프로세스가 죽어도 이 시간이 지나면 다시 예약할 수 있다.
+    generating_timeout = 60
+
+    def __init__(self):
+        super().__init__()
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+    def set_state(self, file, state):
+        if state == CacheFileState.GENERATING:
+            self.cache.set(self.get_key(file), state, self.generating_timeout)
+        else:
+            super().set_state(file, state)
+
+    def schedule_generation(self, file, force=False):
+        # 같은 파일이 이미 예약되어 있으면 다시 넣지 않는다.
+        with self._pending_lock:
+            if file.name in self._pending:
+                return
+            self._pending.add(file.name)
+        get_executor().submit(self.run, file, force)
+
+    def run(self, file, force=False):
+        try:
+            # 상태를 모르면 storage를 확인해서 이미 있는 파일은 다시 만들지 않는다.
+            generate_file(file, force=force)
+        except Exception:
+            logger.exception('thumbnail generation failed: %s', file.name)
+            self.set_state(file, CacheFileState.DOES_NOT_EXIST)
+            return
+        finally:
+            with self._pending_lock:
+                self._pending.discard(file.name)
+        # placeholder가 들어간 상세 페이지 cache를 갱신
+        instance = getattr(getattr(file.generator, 'source', None), 'instance', None)
+        if instance is not None and instance._meta.label == 'articles.Article':
+            from . import cache
+            cache.invalidate_article(instance.pk)
+
+
+def is_ready(file):
+    return file.cachefile_backend.exists(file)
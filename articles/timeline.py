@@ -0,0 +1,206 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from .models import Article, TimelineEntry
+from .pagination import decode_cursor, encode_cursor, paginate
+
+# fan-out-on-write home timeline
+# - 글 작성 : 작성자 + 팔로워들의 timeline에 TimelineEntry 추가
+# - 글 삭제 : TimelineEntry는 FK CASCADE로 함께 삭제
+# - 팔로우 : 상대방의 최근 글을 내 timeline에 채워 넣음 (backfill)
+# - 언팔로우 : 상대방의 글을 내 timeline에서 제거 (prune)
+#   팔로워가 줄어 인기 작성자에서 내려오면 최근 글을 팔로워들에게 다시 펼친다. (refill)
+# 팔로워가 TIMELINE_FANOUT_LIMIT명을 넘는 인기 작성자는 펼치지 않고
+# 읽을 때 따로 조회해서 합친다. (fan-out-on-read)
+
+ARTICLE_FIELDS = ('id', 'title', 'created_at')
+
+
+def _follow_through():
+    return get_user_model().followers.through
+
+
+def follower_ids(author_id):
+    # followers through table : from_user = 팔로우 당한 사람, to_user = 팔로워
+    return list(_follow_through().objects.filter(from_user_id=author_id).values_list('to_user_id', flat=True))
+
+
+def is_popular(author_id):
+    return get_user_model().objects.filter(
+        pk=author_id, follower_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).exists()
+
+
+def popular_following_ids(user):
+    return list(
+        user.followings.filter(
+            follower_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+        ).values_list('id', flat=True)
+    )
+
+
+def fan_out(article):
+    owner_ids = {article.user_id}
+    if not is_popular(article.user_id):
+        owner_ids.update(follower_ids(article.user_id))
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(owner_id=owner_id, article=article) for owner_id in owner_ids],
+        ignore_conflicts=True,
+    )
+
+
+INSERT_IGNORE_SQL = {
+    'sqlite': 'INSERT OR IGNORE INTO {entry} (owner_id, article_id) {select}',
+    'postgresql': 'INSERT INTO {entry} (owner_id, article_id) {select} ON CONFLICT DO NOTHING',
+}
+
+
+def backfill(follower_id, author_ids):
+    """follower의 timeline에 author_ids(인기 작성자 제외)의 최근 글을 author마다 TIMELINE_BACKFILL_SIZE개씩 채운다.
+
+    한 번에 여러 명을 팔로우해도 author 수와 관계없이 INSERT ... SELECT 한 번
+    (rebuild와 같이 ROW_NUMBER로 author별 최근 글을 고른다.)
+    """
+    author_ids = list(author_ids)
+    if not author_ids:
+        return
+    tables = {
+        'entry': TimelineEntry._meta.db_table,
+        'article': Article._meta.db_table,
+        'user': get_user_model()._meta.db_table,
+    }
+    select = (
+        'SELECT %s, a.id FROM ('
+        'SELECT a.id, ROW_NUMBER() OVER (PARTITION BY a.user_id ORDER BY a.id DESC) AS recent '
+        'FROM {article} a INNER JOIN {user} u ON u.id = a.user_id '
+        'WHERE a.user_id IN ({authors}) AND u.follower_count <= %s'
+        ') a WHERE a.recent <= %s'
+    ).format(authors=', '.join(['%s'] * len(author_ids)), **tables)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            INSERT_IGNORE_SQL[connection.vendor].format(select=select, **tables),
+            [follower_id, *author_ids, settings.TIMELINE_FANOUT_LIMIT, settings.TIMELINE_BACKFILL_SIZE],
+        )
+
+
+def prune(follower_id, author_ids):
+    TimelineEntry.objects.filter(owner_id=follower_id, article__user_id__in=author_ids).delete()
+
+
+def refill(author_id):
+    """author의 최근 글을 현재 팔로워 모두의 timeline에 펼친다.
+
+    인기 작성자였던 동안 쓴 글은 펼치지 않았고, 인기 작성자에서 내려오면 읽을 때 합치지도 않으므로
+    팔로워가 TIMELINE_FANOUT_LIMIT명 이하로 줄어든 순간 채워 넣는다. (팔로워 수 x TIMELINE_BACKFILL_SIZE row 이하)
+    """
+    tables = {
+        'entry': TimelineEntry._meta.db_table,
+        'article': Article._meta.db_table,
+        'follow': _follow_through()._meta.db_table,
+    }
+    select = (
+        'SELECT f.to_user_id, a.id FROM '
+        '(SELECT id FROM {article} WHERE user_id = %s ORDER BY id DESC LIMIT %s) a '
+        'CROSS JOIN {follow} f WHERE f.from_user_id = %s AND f.to_user_id <> %s'
+    ).format(**tables)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            INSERT_IGNORE_SQL[connection.vendor].format(select=select, **tables),
+            [author_id, settings.TIMELINE_BACKFILL_SIZE, author_id, author_id],
+        )
+
+
+def refill_unpopular(author_ids, removed):
+    """팔로워를 author마다 최대 removed명 잃은 뒤 인기 작성자에서 내려온 author를 refill한다.
+
+    카운터가 이미 줄었는지와 관계없이 경계(TIMELINE_FANOUT_LIMIT ± removed) 근처의 author만
+    실제 follow row로 확인하므로 인기 작성자의 언팔로우도 비용이 TIMELINE_FANOUT_LIMIT row 이하다.
+    """
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    candidates = get_user_model().objects.filter(
+        pk__in=author_ids, follower_count__gt=limit - removed, follower_count__lte=limit + removed,
+    ).values_list('pk', flat=True)
+    for author_id in candidates:
+        if not _follow_through().objects.filter(from_user_id=author_id)[limit:limit + 1].exists():
+            refill(author_id)
+
+
+def latest_articles(cursor=None):
+    """전체 글 최신순 한 페이지와 다음 페이지 커서 (index)"""
+    return paginate(Article.objects.only(*ARTICLE_FIELDS), cursor)
+
+
+def home_timeline(user, cursor=None, page_size=None):
+    """user의 explore 한 페이지(글 목록)와 다음 페이지 커서"""
+    page_size = page_size or settings.ARTICLES_PAGE_SIZE
+    last_id = decode_cursor(cursor)
+
+    # 1. 미리 펼쳐 둔 timeline : (owner, article) index 범위 조회
+    entries = TimelineEntry.objects.filter(owner=user).select_related('article').only(
+        'article', *(f'article__{field}' for field in ARTICLE_FIELDS),
+    )
+    if last_id is not None:
+        entries = entries.filter(article_id__lt=last_id)
+    articles = [entry.article for entry in entries.order_by('-article_id')[:page_size + 1]]
+
+    # 2. 인기 작성자의 글은 읽을 때 합친다.
+    popular_ids = popular_following_ids(user)
+    if popular_ids:
+        popular = Article.objects.filter(user_id__in=popular_ids).only(*ARTICLE_FIELDS)
+        if last_id is not None:
+            popular = popular.filter(id__lt=last_id)
+        merged = {article.id: article for article in articles}
+        merged.update((article.id, article) for article in popular.order_by('-id')[:page_size + 1])
+        articles = sorted(merged.values(), key=lambda article: article.id, reverse=True)
+
+    next_cursor = None
+    if len(articles) > page_size:
+        articles = articles[:page_size]
+        next_cursor = encode_cursor(articles[-1].id)
+    return articles, next_cursor
+
+
+
+def rebuild(authors=None):
+    """authors(User queryset, 기본 전체)가 쓴 글의 TimelineEntry를 지우고 다시 펼친다.
+    (bulk_create로 넣은 데이터 등 signal을 거치지 않은 경우)
+
+    row가 많아서 INSERT ... SELECT로 DB 안에서 만든다. 작성자 본인은 모든 글,
+    팔로워는 backfill과 같이 author마다 최근 TIMELINE_BACKFILL_SIZE개 글만 받는다.
+    follower_count가 맞아야 인기 작성자를 건너뛸 수 있으므로 카운터를 먼저 다시 계산해야 한다.
+    """
+    tables = {
+        'entry': TimelineEntry._meta.db_table,
+        'article': Article._meta.db_table,
+        'follow': _follow_through()._meta.db_table,
+        'user': get_user_model()._meta.db_table,
+    }
+    # 대상 글 : {article} 또는 {article} WHERE user_id IN (authors)
+    articles, params = tables['article'], []
+    if authors is None:
+        TimelineEntry.objects.all().delete()
+    else:
+        TimelineEntry.objects.filter(article__user__in=authors).delete()
+        author_sql, params = authors.values('pk').query.sql_with_params()
+        articles, params = f'{articles} WHERE user_id IN ({author_sql})', list(params)
+    with connection.cursor() as cursor:
+        # 작성자 본인
+        cursor.execute(
+            'INSERT INTO {entry} (owner_id, article_id) SELECT user_id, id FROM {articles}'.format(articles=articles, **tables),
+            params,
+        )
+        total = cursor.rowcount
+        # 인기 작성자가 아니면 팔로워들 (from_user = 팔로우 당한 사람, to_user = 팔로워)
+        cursor.execute(
+            'INSERT INTO {entry} (owner_id, article_id) '
+            'SELECT f.to_user_id, a.id FROM ('
+            'SELECT id, user_id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id DESC) AS recent FROM {articles}'
+            ') a '
+            'INNER JOIN {follow} f ON f.from_user_id = a.user_id '
+            'INNER JOIN {user} u ON u.id = a.user_id '
+            'WHERE a.recent <= %s AND u.follower_count <= %s AND f.to_user_id <> a.user_id'.format(articles=articles, **tables),
+            params + [settings.TIMELINE_BACKFILL_SIZE, settings.TIMELINE_FANOUT_LIMIT],
+        )
+        total += cursor.rowcount
+    return total
@@ -0,0 +1,88 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Article, HashTagBucket, HashTagTrend
+
+# 인기 태그 (기간별 태그 사용 수)
+# - HashTagBucket : (태그, 글 작성일)별 사용 수
+# - HashTagTrend : (window, 태그)별 최근 N일 사용 수
+# 글 저장/삭제 때 추가/삭제된 태그만 F()로 증감하고,
+# 하루가 지나 window 밖으로 나간 bucket은 roll()이 빼 준다.
+
+
+def window_start(days, today=None):
+    today = today or timezone.localdate()
+    return today - datetime.timedelta(days=days - 1)
+
+
+def retention_start(today=None):
+    # 가장 긴 window보다 오래된 bucket은 필요 없다.
+    return window_start(max(settings.TRENDING_WINDOWS.values()), today)
+
+
+def record(article, added=(), removed=()):
+    """article에 태그가 추가/삭제된 만큼 bucket과 trend를 증감한다."""
+    day = timezone.localdate(article.created_at)
+    if day < retention_start():
+        return
+    with transaction.atomic():
+        _adjust(HashTagBucket, {'day': day}, added, removed)
+        for window, days in settings.TRENDING_WINDOWS.items():
+            if day >= window_start(days):
+                _adjust(HashTagTrend, {'window': window}, added, removed)
+
+
+def _adjust(model, lookup, added, removed):
+    if added:
+        model.objects.bulk_create(
+            [model(hashtag_id=tag_id, **lookup) for tag_id in added], ignore_conflicts=True,
+        )
+        model.objects.filter(hashtag_id__in=added, **lookup).update(count=F('count') + 1)
+    if removed:
+        model.objects.filter(hashtag_id__in=removed, count__gt=0, **lookup).update(count=F('count') - 1)
+
+
+def roll(today=None):
+    """오래된 bucket을 지우고 window별 trend를 bucket 합계로 다시 만든다. (하루 한 번)"""
+    with transaction.atomic():
+        HashTagBucket.objects.filter(day__lt=retention_start(today)).delete()
+        HashTagBucket.objects.filter(count=0).delete()
+        HashTagTrend.objects.all().delete()
+        for window, days in settings.TRENDING_WINDOWS.items():
+            totals = HashTagBucket.objects.filter(day__gte=window_start(days, today)).values(
+                'hashtag_id',
+            ).annotate(total=Sum('count')).order_by()
+            HashTagTrend.objects.bulk_create([
+                HashTagTrend(hashtag_id=row['hashtag_id'], window=window, count=row['total'])
+                for row in totals
+            ])
+
+
+def recount(today=None):
+    """bucket을 글/태그 데이터로 처음부터 다시 계산하고 trend를 다시 만든다."""
+    start = retention_start(today)
+    counts = {}
+    rows = Article.hashtags.through.objects.filter(
+        article__created_at__gte=timezone.make_aware(datetime.datetime.combine(start, datetime.time())),
+    ).values_list('hashtag_id', 'article__created_at')
+    for hashtag_id, created_at in rows.iterator():
+        key = (hashtag_id, timezone.localdate(created_at))
+        counts[key] = counts.get(key, 0) + 1
+    with transaction.atomic():
+        HashTagBucket.objects.all().delete()
+        HashTagBucket.objects.bulk_create([
+            HashTagBucket(hashtag_id=hashtag_id, day=day, count=count)
+            for (hashtag_id, day), count in counts.items()
+        ])
+        roll(today)
+
+
+def top_tags(window='day', limit=None):
+    return list(
+        HashTagTrend.objects.filter(window=window, count__gt=0).select_related('hashtag')
+        .order_by('-count')[:limit or settings.TRENDING_TAGS_SIZE]
+    )
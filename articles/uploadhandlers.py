@@ -0,0 +1,162 @@
+import hashlib
+import io
+import os
+import tempfile
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers, StopUpload
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+from .storage import blob_storage
+
+# 이미지 업로드를 받으면서 바로 검사하는 upload handler
+# - 요청 전체 크기가 너무 크면 body를 읽지 않고 중단
+# - 첫 chunk의 magic bytes로 포맷, 헤더로 가로/세로 크기를 확인해서 이미지가 아니면 바로 건너뜀
+# - 통과한 데이터는 blob 저장소의 임시 디렉터리에 쓰면서 sha256 계산
+#   -> 저장할 때 다시 읽거나 복사하지 않고 rename만 한다. (articles/storage.py)
+
+MAGIC_BYTES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+)
+HEADER_LIMIT = 256 * 1024  # 이 안에서 이미지 헤더(크기)를 읽지 못하면 거부
+FORM_OVERHEAD = 1024 * 1024  # 요청 전체 크기 검사 시 이미지 외 다른 필드 몫
+
+
+def sniff_format(header):
+    for magic, image_format in MAGIC_BYTES:
+        if header.startswith(magic):
+            return image_format
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+def upload_errors(request):
+    return getattr(request, 'upload_errors', [])
+
+
+class BlobUploadedFile(UploadedFile):
+    """blob 저장소 임시 디렉터리에 이미 써 둔 업로드 파일 (sha256 포함)"""
+
+    def __init__(self, path, name, content_type, size, charset, sha256):
+        super().__init__(open(path, 'rb'), name, content_type, size, charset)
+        self.path = path
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.path
+
+    def close(self):
+        # 저장되지 않은(검증 실패) 경우 임시 파일 정리. 저장되었으면 이미 옮겨져 있다.
+        try:
+            return self.file.close()
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class ImageUploadHandler(FileUploadHandler):
+    # FileUploadHandler.new_file이 self.field_name을 현재 필드 이름으로 덮어쓰므로 따로 둔다.
+    target_field = 'image'
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.request_length = content_length
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name == self.target_field
+        if not self.active:
+            return
+        if self.request_length > settings.ARTICLE_IMAGE_MAX_SIZE + FORM_OVERHEAD:
+            # 나머지 body는 읽지 않는다.
+            self.active = False
+            self.reject('이미지 파일이 너무 큽니다.')
+            raise StopUpload(connection_reset=True)
+        fd, self.path = tempfile.mkstemp(dir=blob_storage.temp_dir())
+        self.file = os.fdopen(fd, 'wb')
+        self.hasher = hashlib.sha256()
+        self.header = b''
+        self.size = 0
+        self.checked = False
+        # 다른 handler(메모리/임시 파일)는 이 파일을 받지 않는다.
+        raise StopFutureHandlers
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self.size += len(raw_data)
+        if self.size > settings.ARTICLE_IMAGE_MAX_SIZE:
+            self.skip('이미지 파일이 너무 큽니다.')
+        if not self.checked:
+            self.header += raw_data
+            self.check_header()
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def check_header(self):
+        if len(self.header) >= 12 and sniff_format(self.header) is None:
+            self.skip('이미지 파일(JPEG, PNG, GIF, WEBP)만 올릴 수 있습니다.')
+        try:
+            # Image.open은 헤더만 읽는다. (디코딩 X)
+            width, height = Image.open(io.BytesIO(self.header)).size
+        except Exception:
+            if len(self.header) > HEADER_LIMIT:
+                self.skip('이미지 정보를 읽을 수 없습니다.')
+            return
+        if width * height > settings.ARTICLE_IMAGE_MAX_PIXELS:
+            self.skip(f'이미지 해상도가 너무 큽니다. ({width}x{height})')
+        self.checked = True
+        self.header = b''
+
+    def skip(self, message):
+        self.reject(message)
+        self.cleanup()
+        raise SkipFile
+
+    def reject(self, message):
+        self.request.upload_errors = upload_errors(self.request) + [message]
+
+    def cleanup(self):
+        self.file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.active = False
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        self.active = False
+        self.file.close()
+        if not self.checked:
+            os.remove(self.path)
+            self.reject('이미지 정보를 읽을 수 없습니다.')
+            return None
+        return BlobUploadedFile(
+            self.path, self.file_name, self.content_type, self.size, self.charset, self.hasher.hexdigest(),
+        )
+
+    def upload_complete(self):
+        # StopUpload 등으로 중간에 끝난 경우
+        if getattr(self, 'active', False):
+            self.cleanup()
+
+
+def stream_image_upload(view):
+    """view에서 ImageUploadHandler를 쓰도록 한다.
+
+    upload handler는 request.POST를 읽기 전에 바꿔야 하므로
+    csrf 검사(POST를 읽음)를 handler 설정 뒤로 미룬다.
+    """
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers.insert(0, ImageUploadHandler(request))
+        return csrf_protect(view)(request, *args, **kwargs)
+    return wrapper
@@ -13,8 +13,10 @@ urlpatterns = [
     # path('<int:article_pk>/edit/', views.edit, name='edit'),
     path('<int:article_pk>/update/', views.update, name='update'),
     path('<int:article_pk>/comment_create/', views.comment_create, name='comment_create'),
+    path('<int:article_pk>/comments/', views.comment_list, name='comment_list'),
     path('<int:article_pk>/comment/<int:comment_pk>/delete/', views.comment_delete, name='comment_delete'),
     path('<int:article_pk>/like/', views.like, name='like'),
     path('explore/', views.explore, name='explore'),
+    path('search/', views.search, name='search'),
         
 ]
\ No newline at end of file
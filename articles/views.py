@@ -8,16 +8,25 @@ from django.core.exceptions import PermissionDenied
 from django.http import HttpResponseForbidden, JsonResponse, HttpResponse
 
 from django.contrib.auth import get_user_model 
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 from IPython import embed
 
 
 from .forms import ArticleForm, CommentForm
 from .models import Article, Comment, HashTag
+from . import cache, hashtags, likes, search as search_index, timeline
+from .comments import comment_page, serialize_comment
+from .uploadhandlers import stream_image_upload, upload_errors
+from crud.replicas import read_only
 # Create your views here.
+@read_only
 def index(request):
-    articles = Article.objects.order_by('-id')
+    # 목록 템플릿은 id, title, created_at 만 사용
+    articles, next_cursor = timeline.latest_articles(request.GET.get('before'))
     context = {
-        'articles': articles
+        'articles': articles,
+        'next_cursor': next_cursor,
     }
     # embed()
     return render(request, 'articles/index.html', context)
@@ -26,6 +35,7 @@ def index(request):
 #     if request.method == 'GET':
 #         return render(request, 'articles/new.html')
     
+@stream_image_upload
 @login_required
 def create(request):
     # if not request.user.is_authenticated:
@@ -36,7 +46,7 @@ def create(request):
     # POST 요청 -> 검증 및 저장 로직
         # title = request.POST.get('title')
         # content = request.POST.get('content')
-        article_form = ArticleForm(request.POST, request.FILES)
+        article_form = ArticleForm(request.POST, request.FILES, upload_errors=upload_errors(request))
         if article_form.is_valid():
         # 검증에 성공하면 저장
             # title = article_form.cleaned_data.get('title')
@@ -44,18 +54,7 @@ def create(request):
             # article = Article(title=title, content=content)
             article = article_form.save(commit=False)
             article.user = request.user  # User class의 객체
-            article.save()
-            
-            # 해시태그 저장 및 연결 작업
-            for word in article.content.split():
-                if word.startswith('#'):
-                    hashtag, created = HashTag.objects.get_or_create(content=word)
-                    article.hashtags.add(hashtag)
-                    # if HashTag.objects.filter(content=word).exists():
-                    #     hashtag = HashTag.objects.get(content=word)
-                    # try:
-                    #     hashtag = HashTag.objects.get(content=word)
-                    # except:
+            article.save()  # 해시태그 저장 및 연결 작업은 post_save에서 (articles/signals.py)
             # article = article_form.save(commit=False)
             # article.image = request.FILES.get('image')
             # embed()
@@ -75,16 +74,25 @@ def create(request):
     return render(request, 'articles/form.html', context)
 
 
+@read_only
 def detail(request, article_pk):
     # article = Article.objects.get(pk=article_pk)
     article = get_object_or_404(Article, pk=article_pk)
-    comments = article.comment_set.all()
+    # 댓글 첫 페이지 (cache miss일 때만 평가된다.)
+    first_comments = SimpleLazyObject(lambda: dict(zip(('comments', 'next_cursor'), comment_page(article.pk))))
     comment_form = CommentForm()
+    # 사용자마다 다른 부분(좋아요 상태)은 cache fragment 밖에서 따로 계산
+    is_liked = request.user.is_authenticated and Article.like_users.through.objects.filter(
+        article_id=article.pk, user_id=request.user.pk,
+    ).exists()
     a = ['22', '33', '44']
     context = {
         'article': article,
-        'comments': comments,
+        'comment_page': first_comments,
         'comment_form': comment_form,
+        'is_liked': is_liked,
+        'cache_version': cache.article_version(article.pk),
+        'cache_timeout': settings.ARTICLE_CACHE_TIMEOUT,
         'a': a
     }
     return render(request, 'articles/detail.html', context)
@@ -117,24 +125,19 @@ def delete(request, article_pk):
 #         article.save()
 #         return redirect('articles:detail', article.pk)    
 
+@stream_image_upload
 def update(request, article_pk):
     article = get_object_or_404(Article, pk=article_pk)
     if request.user == article.user:
         # if request.user != article.user:
             # return redirect('articles:detail', article_pk)
         if request.method == 'POST':
-            article_form = ArticleForm(request.POST, instance=article)   # 수정할 대상이 article이기 때문에 instance로 입력 설정
+            article_form = ArticleForm(request.POST, request.FILES, instance=article, upload_errors=upload_errors(request))   # 수정할 대상이 article이기 때문에 instance로 입력 설정
             if article_form.is_valid():
                 # article.title = article_form.cleaned_data.get('title')
                 # article.content = article_form.cleaned_data.get('content')
                 # article.save()
-                article = article_form.save()
-                # 해시태그 수정
-                article.hashtags.clear()
-                for word in article.content.split():
-                    if word.startswith('#'):
-                        hashtag, created = HashTag.objects.get_or_create(content=word)
-                        article.hashtags.add(hashtag)
+                article = article_form.save()  # 해시태그 수정은 post_save에서 (바뀐 태그만 추가/삭제)
                 return redirect('articles:detail', article.pk)
         else:
             # article_form = ArticleForm(
@@ -183,6 +186,18 @@ def comment_create(request, article_pk):
 
 
 
+@read_only
+def comment_list(request, article_pk):
+    # 상세 페이지 '댓글 더 보기'용 JSON
+    get_object_or_404(Article.objects.only('pk'), pk=article_pk)
+    comments, next_cursor = comment_page(article_pk, request.GET.get('after'))
+    context = {
+        'comments': [serialize_comment(comment) for comment in comments],
+        'next_cursor': next_cursor,
+    }
+    return JsonResponse(context)
+
+
 @require_POST
 @login_required
 def comment_delete(request, article_pk, comment_pk):
@@ -199,40 +214,49 @@ def comment_delete(request, article_pk, comment_pk):
 def like(request, article_pk):
     # 좋아요를 눌렀다면
     if request.is_ajax():
-        article = Article.objects.get(pk=article_pk)
-        if request.user in article.like_users.all():
-            # 좋아요 취소 로직
-            article.like_users.remove(request.user)
-            is_liked = False
-        # 아니면
-        else:
-            # 좋아요 로직
-            article.like_users.add(request.user)
-            is_liked = True
-        
+        article = get_object_or_404(Article.objects.only('id'), pk=article_pk)
+        is_liked, like_count = likes.toggle_like(article.pk, request.user.pk)
         context = {
             'is_liked': is_liked, 
-            'like_count': article.like_users.count()
+            'like_count': like_count
             }
         return JsonResponse(context)
     else:
         return HttpResponseForbidden()
 
+@read_only
 def hashtag(request, tag_pk):
     hashtag = get_object_or_404(HashTag, pk=tag_pk)
+    # through table의 (hashtag_id, article_id) index로 최신 글부터 한 페이지, 작성자는 join
+    articles, next_cursor = hashtags.tagged_articles(hashtag.pk, request.GET.get('before'))
     context = {
-        'hashtag': hashtag
+        'hashtag': hashtag,
+        'articles': articles,
+        'next_cursor': next_cursor,
     }
     return render(request, 'articles/hashtag.html', context)
 
 
+@read_only
+@login_required
 def explore(request):
-    from itertools import chain
     # 내 친구들이(request.user.followings) 작성한 것 + 내가(request.user) 작성한 article 필요
-    followings = request.user.followings.all()
-    followings = chain(followings, [request.user])
-    articles = Article.objects.filter(user__in=followings).order_by('-id')
+    # -> 글 작성/팔로우 시점에 미리 펼쳐 둔 timeline에서 한 번에 읽는다.
+    articles, next_cursor = timeline.home_timeline(request.user, request.GET.get('before'))
+    context = {
+        'articles': articles,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'articles/index.html', context)
+
+
+@read_only
+def search(request):
+    query = request.GET.get('q', '').strip()
+    articles, next_cursor = search_index.search(query, request.GET.get('after'))
     context = {
-        'articles': articles
+        'query': query,
+        'articles': articles,
+        'next_cursor': next_cursor,
     }
-    return render(request, 'articles/index.html', context)
\ No newline at end of file
+    return render(request, 'articles/search.html', context)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class CrudConfig(AppConfig):
+    name = 'crud'
+
+    def ready(self):
+        from . import signals  # noqa: F401  signal receiver 등록
@@ -0,0 +1,11 @@
+from django.contrib.sessions.backends import cached_db
+
+from .sessions import SkipUnchangedSaveMixin
+
+# SESSION_ENGINE = 'crud.cached_sessions' (CRUD_SESSION_MODE=cached_db)
+# cached_db session : 읽기는 cache에서 하고 cache에 없을 때만 DB를 읽는다.
+# 내용이 바뀌지 않았으면 DB/cache에 다시 쓰지 않는다. (crud/sessions.py)
+
+
+class SessionStore(SkipUnchangedSaveMixin, cached_db.SessionStore):
+    pass
@@ -0,0 +1,34 @@
+from django.db.models import Count, F, IntegerField, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+# 역정규화 카운터 공통 코드 (articles, accounts 양쪽에서 사용)
+
+
+class CounterFieldsMixin:
+    # 카운터 컬럼은 F()로만 갱신한다.
+    # 이미 저장된 객체를 save()할 때 메모리에 있던 (오래된) 카운터 값으로 덮어쓰지 않도록 제외한다.
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+def adjust(model, pks, field, delta):
+    # UPDATE ... SET field = field + delta : 동시에 들어온 요청끼리 값을 덮어쓰지 않는다.
+    # 감소는 0 아래로 내려가지 않게 자른다. (PositiveIntegerField CHECK 제약 위반 IntegrityError 방지)
+    if pks and delta:
+        value = F(field) + delta
+        if delta < 0:
+            value = Greatest(value, Value(0))
+        model.objects.filter(pk__in=pks).update(**{field: value})
+
+
+def count_subquery(queryset, group_field):
+    counts = queryset.order_by().values(group_field).annotate(count=Count('*')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
@@ -0,0 +1,65 @@
+import os
+
+# 환경변수로 고르는 DB 설정
+# CRUD_DB_ENGINE=sqlite(기본) | postgresql
+#   sqlite     : CRUD_DB_NAME (기본 BASE_DIR/db.sqlite3)
+#   postgresql : CRUD_DB_NAME, CRUD_DB_USER, CRUD_DB_PASSWORD, CRUD_DB_HOST, CRUD_DB_PORT
+# CRUD_DB_CONN_MAX_AGE : connection 재사용 시간(초), postgresql 기본 60
+# CRUD_DB_REPLICAS : 읽기 전용 replica 목록(콤마로 구분)
+#   sqlite는 DB 파일 경로, postgresql은 host (crud/replicas.py)
+
+# connection이 만들어질 때마다 실행하는 SQLite PRAGMA (crud/signals.py)
+# - WAL : 쓰는 동안에도 읽기가 막히지 않는다.
+# - synchronous=NORMAL : WAL에서는 commit마다 fsync하지 않아도 DB가 깨지지 않는다.
+# - mmap_size : 읽기를 system call 대신 memory map으로
+# - busy_timeout : lock이 풀릴 때까지 바로 실패하지 않고 기다린다.
+SQLITE_PRAGMAS = (
+    # busy_timeout을 먼저 : journal_mode 변경도 lock을 기다리게
+    ('busy_timeout', 5000),
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('mmap_size', 256 * 1024 * 1024),
+    ('temp_store', 'MEMORY'),
+)
+
+
+def database_config(base_dir):
+    engine = os.environ.get('CRUD_DB_ENGINE', 'sqlite')
+    if engine == 'postgresql':
+        return {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('CRUD_DB_NAME', 'crud'),
+            'USER': os.environ.get('CRUD_DB_USER', ''),
+            'PASSWORD': os.environ.get('CRUD_DB_PASSWORD', ''),
+            'HOST': os.environ.get('CRUD_DB_HOST', ''),
+            'PORT': os.environ.get('CRUD_DB_PORT', ''),
+            # 요청마다 새로 연결하지 않고 connection을 재사용
+            'CONN_MAX_AGE': int(os.environ.get('CRUD_DB_CONN_MAX_AGE', 60)),
+            'OPTIONS': {'connect_timeout': 5},
+        }
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('CRUD_DB_NAME', os.path.join(base_dir, 'db.sqlite3')),
+        'CONN_MAX_AGE': int(os.environ.get('CRUD_DB_CONN_MAX_AGE', 0)),
+        'OPTIONS': {'timeout': 5},
+    }
+
+
+def replica_configs(default):
+    replicas = {}
+    for i, target in enumerate(filter(None, os.environ.get('CRUD_DB_REPLICAS', '').split(',')), 1):
+        config = dict(default)
+        if config['ENGINE'] == 'django.db.backends.sqlite3':
+            config['NAME'] = target.strip()
+        else:
+            config['HOST'] = target.strip()
+        # 테스트에서는 replica도 default 테스트 DB를 그대로 사용
+        config['TEST'] = {'MIRROR': 'default'}
+        replicas[f'replica{i}'] = config
+    return replicas
+
+
+def apply_sqlite_pragmas(cursor, pragmas=SQLITE_PRAGMAS):
+    for name, value in pragmas:
+        cursor.execute(f'PRAGMA {name} = {value}')
+
@@ -0,0 +1,83 @@
+import statistics
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.cached_db import KEY_PREFIX
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment
+from django.urls import reverse
+
+ENGINES = [
+    ('db', 'django.contrib.sessions.backends.db'),
+    ('cached_db', 'django.contrib.sessions.backends.cached_db'),
+    ('crud_db', 'crud.sessions'),
+    ('crud_cdb', 'crud.cached_sessions'),
+    ('cookies', 'django.contrib.sessions.backends.signed_cookies'),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def session_queries(captured):
+    return sum('django_session' in query['sql'] for query in captured)
+
+
+class Command(BaseCommand):
+    help = 'session backend별로 로그인한 요청 한 번에 django_session 쿼리가 몇 번 실행되는지 비교한다. (rollback)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--url', default=reverse('articles:explore'))
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.order_by('pk').first()
+        if user is None:
+            raise CommandError('데이터가 없습니다. 먼저 manage.py seed를 실행하세요.')
+        setup_test_environment()
+
+        # reads : GET 요청 한 번의 session 쿼리 수
+        # rewrites : 같은 값을 다시 대입하고 저장할 때의 session 쿼리 수
+        self.stdout.write(f"{'engine':<10} {'reads/req':>10} {'rewrites':>10} {'p50 ms':>8}")
+        for label, engine in ENGINES:
+            with override_settings(SESSION_ENGINE=engine):
+                try:
+                    with transaction.atomic():
+                        reads, rewrites, timings = self.run(user, options)
+                        raise Rollback
+                except Rollback:
+                    pass
+            self.stdout.write('{:<10} {:>10.2f} {:>10.2f} {:>8.2f}'.format(
+                label, statistics.mean(reads), statistics.mean(rewrites), statistics.median(timings) * 1000,
+            ))
+
+    def run(self, user, options):
+        # middleware는 Client마다 새로 만들어지므로 바뀐 SESSION_ENGINE을 사용한다.
+        client = Client()
+        client.force_login(user)
+        session_key = client.cookies[settings.SESSION_COOKIE_NAME].value
+        SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+        reads, rewrites, timings = [], [], []
+        try:
+            for _ in range(options['requests']):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    client.get(options['url'])
+                    timings.append(time.perf_counter() - started)
+                reads.append(session_queries(captured))
+
+                with CaptureQueriesContext(connection) as captured:
+                    session = SessionStore(session_key)
+                    session['_auth_user_id'] = session['_auth_user_id']
+                    session.save()
+                rewrites.append(session_queries(captured))
+        finally:
+            # rollback된 session이 cache에 남지 않도록
+            caches[settings.SESSION_CACHE_ALIAS].delete(KEY_PREFIX + session_key)
+        return reads, rewrites, timings
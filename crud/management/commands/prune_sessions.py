@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = '만료된 session을 batch 단위로 지운다. (clearsessions와 같지만 한 번에 큰 DELETE를 하지 않는다. --interval을 주면 계속 반복)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--interval', type=float, default=0, help='반복 간격(초), 0이면 한 번만 실행')
+        parser.add_argument('--pause', type=float, default=0.05, help='batch 사이에 쉬는 시간(초) : 다른 쓰기가 기다리지 않도록')
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE.endswith('signed_cookies'):
+            self.stdout.write('signed cookie session은 DB에 저장하지 않으므로 지울 것이 없습니다.')
+            return
+        while True:
+            deleted = self.prune(options['batch_size'], options['pause'])
+            self.stdout.write(f'만료된 session {deleted}개를 지웠습니다.')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def prune(self, batch_size, pause):
+        total = 0
+        now = timezone.now()
+        while True:
+            # 짧은 transaction 여러 번 : SQLite에서 쓰기 lock을 오래 잡지 않는다.
+            keys = list(Session.objects.filter(expire_date__lt=now).values_list('pk', flat=True)[:batch_size])
+            if not keys:
+                return total
+            total += Session.objects.filter(pk__in=keys).delete()[0]
+            time.sleep(pause)
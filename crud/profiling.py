@@ -0,0 +1,166 @@
+import random
+import re
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.http import JsonResponse
+from django.template.backends.django import DjangoTemplates, Template
+
+# 요청별 SQL/시간 계측 (일부 요청만 sampling)
+# - ProfilingMiddleware : 쿼리 수, DB 시간, template 시간, 응답 크기, 같은 SQL 반복(N+1)을 기록하고
+#   Server-Timing header로 돌려준다.
+# - URL 이름(articles:detail 등)별 최근 PROFILING_WINDOW개 sample을 메모리에 모아
+#   /admin/profiling/ (staff 전용)에서 JSON으로 보여준다.
+
+_state = threading.local()
+_lock = threading.Lock()
+_samples = {}
+
+# IN (%s, %s, ...) 길이가 달라도 같은 쿼리로 본다.
+IN_PARAMS_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class Sample:
+    def __init__(self):
+        self.queries = Counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper : 실행된 SQL(파라미터 제외)과 시간을 기록
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.query_count += 1
+            self.queries[IN_PARAMS_RE.sub('IN (...)', sql)] += 1
+
+    def duplicates(self):
+        threshold = settings.PROFILING_DUPLICATE_THRESHOLD
+        return {sql: count for sql, count in self.queries.items() if count >= threshold}
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        sample = _state.sample = Sample()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(sample))
+                response = self.get_response(request)
+        finally:
+            _state.sample = None
+        total = time.perf_counter() - started
+
+        match = request.resolver_match
+        name = match.view_name if match else 'unresolved'
+        size = len(response.content) if not response.streaming else None
+        record(name, {
+            'time': total,
+            'queries': sample.query_count,
+            'db_time': sample.db_time,
+            'template_time': sample.template_time,
+            'size': size,
+            'duplicates': sample.duplicates(),
+        })
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={sample.db_time * 1000:.1f};desc="{sample.query_count} queries"',
+            f'tpl;dur={sample.template_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        return response
+
+
+def record(name, values):
+    with _lock:
+        if name not in _samples:
+            _samples[name] = deque(maxlen=settings.PROFILING_WINDOW)
+        _samples[name].append(values)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize():
+    with _lock:
+        snapshot = {name: list(samples) for name, samples in _samples.items()}
+    report = {}
+    for name, samples in snapshot.items():
+        times = [sample['time'] * 1000 for sample in samples]
+        sizes = [sample['size'] for sample in samples if sample['size'] is not None]
+        duplicates = Counter()
+        for sample in samples:
+            for sql, count in sample['duplicates'].items():
+                duplicates[sql] = max(duplicates[sql], count)
+        report[name] = {
+            'samples': len(samples),
+            'time_ms': {
+                'p50': round(percentile(times, 0.5), 2),
+                'p90': round(percentile(times, 0.9), 2),
+                'p99': round(percentile(times, 0.99), 2),
+            },
+            'queries': {
+                'mean': round(statistics.mean(sample['queries'] for sample in samples), 2),
+                'max': max(sample['queries'] for sample in samples),
+            },
+            'db_ms': round(statistics.mean(sample['db_time'] * 1000 for sample in samples), 2),
+            'template_ms': round(statistics.mean(sample['template_time'] * 1000 for sample in samples), 2),
+            'size_bytes': round(statistics.mean(sizes)) if sizes else None,
+            # 요청 한 번에 같은 SQL이 여러 번 실행된 경우 (N+1 의심)
+            'duplicate_queries': [
+                {'sql': sql, 'count': count} for sql, count in duplicates.most_common(5)
+            ],
+        }
+    return report
+
+
+@staff_member_required
+def report(request):
+    return JsonResponse({
+        'sample_rate': settings.PROFILING_SAMPLE_RATE,
+        'window': settings.PROFILING_WINDOW,
+        'views': summarize(),
+    })
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        sample = getattr(_state, 'sample', None)
+        # sampling 중이 아니거나, template 안에서 다시 render하는 경우는 그대로
+        if sample is None or sample.rendering:
+            return super().render(context, request)
+        sample.rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            sample.template_time += time.perf_counter() - started
+            sample.rendering = False
+
+
+class ProfilingTemplates(DjangoTemplates):
+    """render 시간을 ProfilingMiddleware에 기록하는 DjangoTemplates backend"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
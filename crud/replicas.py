@@ -0,0 +1,87 @@
+import random
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# 읽기 전용 view의 쿼리를 replica DB로 보낸다.
+# - @read_only가 붙은 view 안에서만 replica를 쓰고, 나머지(쓰기, 미들웨어의 session/auth 등)는 default
+#   session, request.user는 lazy하게 읽히므로 @read_only에서 replica로 바꾸기 전에 미리 읽어 둔다.
+# - 앱 데이터(글/댓글/좋아요/팔로우 등)를 쓴 요청 뒤에는 REPLICA_PIN_SECONDS 동안 cookie로 default에 고정 (read-your-writes)
+#   session 저장처럼 매 요청 생길 수 있는 쓰기는 고정하지 않는다.
+
+# 항상 default에서 읽는 앱 (session, 권한, 로그인 관련)
+PRIMARY_APPS = {'sessions', 'auth', 'contenttypes', 'admin', 'sites', 'account', 'socialaccount'}
+# 쓰면 replica 고정 cookie를 주는 앱
+PINNING_APPS = {'accounts', 'articles'}
+
+_state = threading.local()
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        if getattr(_state, 'read_only', False) and not getattr(_state, 'pinned', False):
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in PINNING_APPS:
+            _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica는 default의 복사본이므로 어느 DB에서 읽은 객체끼리도 연결 가능
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # replica의 schema는 복제로 맞춘다.
+        return db == DEFAULT_DB_ALIAS
+
+
+def load_user(request):
+    # AuthenticationMiddleware의 request.user는 처음 쓸 때 session과 사용자를 읽는 lazy object
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_authenticated
+
+
+def read_only(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        # session과 로그인 사용자는 default에서 읽는다.
+        load_user(request)
+        previous = getattr(_state, 'read_only', False)
+        _state.read_only = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _state.read_only = previous
+    return wrapper
+
+
+class ReplicaPinMiddleware:
+    """DB에 쓴 요청 뒤 짧은 시간 동안은 그 사용자의 읽기도 default DB에서"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie = settings.REPLICA_PIN_COOKIE
+        _state.pinned = cookie in request.COOKIES
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+            wrote = _state.wrote
+        finally:
+            _state.pinned = _state.wrote = False
+        if wrote and replica_aliases():
+            response.set_cookie(cookie, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.sessions.backends import db
+
+# SESSION_ENGINE = 'crud.sessions' (CRUD_SESSION_MODE=db, 기본)
+# DB session : 값을 대입했더라도 내용이 읽었을 때와 같으면 다시 쓰지 않는다.
+# (SESSION_SAVE_EVERY_REQUEST로 만료 시간을 늘리는 경우는 매번 저장)
+# cached_db 버전은 crud/cached_sessions.py
+
+
+class SkipUnchangedSaveMixin:
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded_data = None
+
+    def _fingerprint(self, data):
+        return self.serializer().dumps(data)
+
+    def load(self):
+        data = super().load()
+        self._loaded_data = self._fingerprint(data)
+        return data
+
+    def is_unchanged(self):
+        return (
+            self.session_key is not None
+            and self._loaded_data is not None
+            and self._fingerprint(self._get_session()) == self._loaded_data
+        )
+
+    def save(self, must_create=False):
+        if not must_create and not settings.SESSION_SAVE_EVERY_REQUEST and self.is_unchanged():
+            return
+        super().save(must_create)
+        self._loaded_data = self._fingerprint(self._get_session())
+
+
+class SessionStore(SkipUnchangedSaveMixin, db.SessionStore):
+    pass
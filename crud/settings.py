@@ -12,6 +12,10 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
+from .db import database_config, replica_configs
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -33,6 +37,7 @@ ALLOWED_HOSTS = []
 INSTALLED_APPS = [
     'accounts',
     'articles',
+    'crud',  # 프로젝트 공통 (SQLite PRAGMA signal, session management command)
     'django.contrib.admin',  # admin
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -52,7 +57,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 가장 바깥에서 session/auth를 포함한 모든 쿼리를 기록 (crud/profiling.py)
+    'crud.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'crud.replicas.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -65,7 +73,8 @@ ROOT_URLCONF = 'crud.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates + render 시간 기록 (crud/profiling.py)
+        'BACKEND': 'crud.profiling.ProfilingTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -85,12 +94,32 @@ WSGI_APPLICATION = 'crud.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# CRUD_DB_* 환경변수로 sqlite / postgresql 선택 (crud/db.py)
+
 DATABASES = {
+    'default': database_config(BASE_DIR),
+}
+DATABASES.update(replica_configs(DATABASES['default']))
+DATABASE_ROUTERS = ['crud.replicas.ReplicaRouter']
+
+# 쓰기 요청 뒤 이 시간(초) 동안은 replica 대신 default에서 읽는다.
+REPLICA_PIN_COOKIE = 'crud_primary'
+REPLICA_PIN_SECONDS = 5
+
+
+# Cache
+# 기본은 local-memory, CRUD_CACHE_DIR 환경변수가 있으면 file 기반 cache 사용
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+if os.environ.get('CRUD_CACHE_DIR'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['CRUD_CACHE_DIR'],
+    }
 
 
 # Password validation
@@ -141,10 +170,48 @@ STATICFILES_DIRS = [
 ]
 # MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
 
+# Session : CRUD_SESSION_MODE 환경변수로 선택
+# - db(기본) : DB session, 내용이 바뀌었을 때만 DB에 쓴다. (crud/sessions.py)
+# - cached_db : cache에서 읽고, 내용이 바뀌었을 때만 DB/cache에 쓴다. (crud/cached_sessions.py)
+#   process마다 따로인 local-memory cache에서는 다른 process의 로그아웃/변경을 모르므로
+#   공유 cache(CRUD_CACHE_DIR)가 있을 때만 사용할 수 있다.
+# - signed_cookies : session을 서명된 cookie에 저장 (DB 사용 안 함)
+SESSION_MODE = os.environ.get('CRUD_SESSION_MODE', 'db')
+if SESSION_MODE == 'cached_db' and not os.environ.get('CRUD_CACHE_DIR'):
+    raise ImproperlyConfigured('CRUD_SESSION_MODE=cached_db는 공유 cache(CRUD_CACHE_DIR)가 필요합니다.')
+SESSION_ENGINE = {
+    'db': 'crud.sessions',
+    'cached_db': 'crud.cached_sessions',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_MODE]
+if SESSION_MODE == 'signed_cookies':
+    # session에 저장하지 않도록 message도 cookie에
+    MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# 배포 모드 : CRUD_SERVE_STATIC=1 이면 crud.wsgi에서 static/media를 직접 서빙 (crud/static.py)
+# collectstatic으로 hash가 붙은 파일과 미리 압축한 .gz/.br을 STATIC_ROOT에 만든다.
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+SERVE_STATIC = os.environ.get('CRUD_SERVE_STATIC') == '1'
+if SERVE_STATIC:
+    STATICFILES_STORAGE = 'crud.static.CompressedManifestStaticFilesStorage'
+
 # media file이 실제로 저장되는 파일의 경로
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+# django-imagekit
+# 썸네일은 Article 저장 시 로컬 thread pool에서 만든다. (articles/thumbnails.py)
+IMAGEKIT_DEFAULT_CACHEFILE_BACKEND = 'articles.thumbnails.ThreadPoolBackend'
+IMAGEKIT_DEFAULT_CACHEFILE_STRATEGY = 'imagekit.cachefiles.strategies.Optimistic'
+THUMBNAIL_WORKERS = 2
+# 상세 페이지 반응형 이미지 (srcset). 포맷은 앞에 있는 것을 우선 사용, JPEG는 <img> fallback
+ARTICLE_IMAGE_WIDTHS = [300, 640, 1280]
+ARTICLE_IMAGE_FORMATS = ['WEBP', 'JPEG']
+ARTICLE_IMAGE_QUALITY = 80
+# 업로드 검사 (articles/uploadhandlers.py)
+ARTICLE_IMAGE_MAX_SIZE = 10 * 1024 * 1024  # bytes
+ARTICLE_IMAGE_MAX_PIXELS = 40 * 1000 * 1000  # 가로 x 세로
+
 
 # AUTH
 LOGIN_URL = '/accounts/login'  # default  @login_required에서 사용
@@ -158,4 +225,29 @@ AUTHENTICATION_BACKENDS = (
 )
 
 SITE_ID = 1 # django.contrib.sites -> SITE_ID 부여
-LOGIN_REDIRECT_URL = 'articles:index'
\ No newline at end of file
+LOGIN_REDIRECT_URL = 'articles:index'
+
+# articles
+ARTICLES_PAGE_SIZE = 20  # index, explore 한 페이지에 보여줄 글 수
+TIMELINE_FANOUT_LIMIT = 1000  # 팔로워가 이보다 많으면 timeline에 펼치지 않고 읽을 때 합친다.
+TIMELINE_BACKFILL_SIZE = 200  # 팔로우 시 timeline에 채워 넣을 상대방의 최근 글 수
+COMMENTS_PAGE_SIZE = 50  # 상세 페이지/댓글 API 한 번에 보여줄 댓글 수
+ARTICLE_CACHE_TIMEOUT = 60 * 10  # 상세 페이지 fragment cache 유지 시간(초)
+# 인기 태그 집계 기간(일) : window 이름 -> 일 수 (매일 manage.py roll_trending 실행)
+TRENDING_WINDOWS = {'day': 1, 'week': 7}
+TRENDING_TAGS_SIZE = 10  # 인기 태그 위젯에 보여줄 태그 수
+SEARCH_MAX_TERMS = 8  # 검색어에서 사용할 최대 단어 수
+SEARCH_MAX_RESULTS = 1000  # 검색 결과는 여기까지만 페이지를 넘길 수 있다.
+API_MAX_PAGE_SIZE = 100  # JSON API 목록의 ?limit= 최댓값 (기본은 ARTICLES_PAGE_SIZE)
+
+# accounts
+FOLLOW_PAGE_SIZE = 30  # 팔로워/팔로잉 목록 한 페이지에 보여줄 사용자 수
+FOLLOW_BATCH_SIZE = 500  # 여러 명을 한 번에 팔로우할 때 한 transaction에서 처리할 사용자 수
+FOLLOW_BULK_LIMIT = 1000  # 요청 한 번에 팔로우/취소할 수 있는 최대 사용자 수
+FOLLOW_SUGGESTION_SAMPLE = 100  # 추천 계산에 사용할 최대 팔로잉 수
+FOLLOW_SUGGESTIONS_SIZE = 5  # 프로필에 보여줄 추천 사용자 수
+
+# 요청 계측 (crud/profiling.py, /admin/profiling/)
+PROFILING_SAMPLE_RATE = float(os.environ.get('CRUD_PROFILING_SAMPLE_RATE', 0.05))  # 계측할 요청 비율
+PROFILING_WINDOW = 500  # URL 이름별로 보관할 최근 sample 수
+PROFILING_DUPLICATE_THRESHOLD = 3  # 요청 한 번에 같은 SQL이 이 횟수 이상이면 N+1로 표시
@@ -0,0 +1,23 @@
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .db import apply_sqlite_pragmas
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    # connection이 만들어질 때마다 SQLite PRAGMA 적용 (crud/db.py)
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            apply_sqlite_pragmas(cursor)
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    # 재사용하는 connection(CONN_MAX_AGE > 0)이 서버 재시작 등으로 끊겼으면 요청 전에 닫는다.
+    # (Django 2.2에는 CONN_HEALTH_CHECKS가 없다.) 요청마다 닫는 connection은 확인하지 않는다.
+    for conn in connections.all():
+        if conn.connection is not None and conn.settings_dict['CONN_MAX_AGE'] and not conn.is_usable():
+            conn.close()
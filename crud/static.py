@@ -0,0 +1,195 @@
+import gzip
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # brotli는 선택 사항
+    brotli = None
+
+# 배포용 static/media 서빙 (별도 웹서버 없이 crud.wsgi에서 사용)
+# - collectstatic : manifest hash가 붙은 파일 + 미리 압축한 .gz/.br 생성
+# - StaticFilesMiddleware : hash가 붙은 파일은 Cache-Control immutable,
+#   Accept-Encoding에 맞는 미리 압축한 파일, ETag/304, Range/206
+
+COMPRESSIBLE = ('.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.ico')
+ONE_YEAR = 60 * 60 * 24 * 365
+CHUNK_SIZE = 64 * 1024
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, *args, **kwargs):
+        for name, hashed_name, processed in super().post_process(*args, **kwargs):
+            if hashed_name and not isinstance(processed, Exception):
+                for path in {self.path(name), self.path(hashed_name)}:
+                    self.compress(path)
+            yield name, hashed_name, processed
+
+    @staticmethod
+    def compress(path):
+        if not path.endswith(COMPRESSIBLE) or not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        encoded = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoded.append(('.br', brotli.compress(data)))
+        for suffix, compressed in encoded:
+            # 5% 이상 줄어들 때만 저장
+            if len(compressed) < len(data) * 0.95:
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+
+
+# collectstatic이 붙이는 hash : name.0123456789ab.ext
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+
+class StaticFilesMiddleware:
+    """STATIC_URL, MEDIA_URL 요청을 Django view를 거치지 않고 파일에서 바로 응답하는 WSGI middleware"""
+
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, application):
+        self.application = application
+        self.mounts = [
+            (settings.STATIC_URL, settings.STATIC_ROOT, self.static_cache_control),
+            (settings.MEDIA_URL, settings.MEDIA_ROOT, self.media_cache_control),
+        ]
+
+    def __call__(self, environ, start_response):
+        try:
+            # WSGI 서버는 PATH_INFO의 byte를 latin-1 문자열로 넘긴다. (PEP 3333) -> 파일 이름은 UTF-8
+            path = environ.get('PATH_INFO', '').encode('latin-1').decode('utf-8')
+        except UnicodeError:
+            return self.application(environ, start_response)
+        if environ.get('REQUEST_METHOD') in ('GET', 'HEAD'):
+            for prefix, root, cache_control in self.mounts:
+                if prefix and root and path.startswith(prefix):
+                    full_path = self.resolve(root, path[len(prefix):])
+                    if full_path:
+                        return self.serve(environ, start_response, full_path, cache_control(path))
+        return self.application(environ, start_response)
+
+    @staticmethod
+    def resolve(root, relative):
+        # root 밖으로 나가는 경로(../)는 무시
+        root = os.path.realpath(root)
+        full_path = os.path.realpath(os.path.join(root, relative))
+        if full_path.startswith(root + os.sep) and os.path.isfile(full_path):
+            return full_path
+        return None
+
+    @staticmethod
+    def static_cache_control(path):
+        if HASHED_NAME_RE.search(path):
+            return f'public, max-age={ONE_YEAR}, immutable'
+        return 'public, max-age=60'
+
+    @staticmethod
+    def media_cache_control(path):
+        # blobs/, CACHE/ 아래 파일은 이름이 내용(hash)으로 정해지므로 바뀌지 않는다.
+        relative = path[len(settings.MEDIA_URL):]
+        cache_dir = getattr(settings, 'IMAGEKIT_CACHEFILE_DIR', 'CACHE')
+        if relative.startswith(('blobs/', cache_dir + '/')):
+            return f'public, max-age={ONE_YEAR}, immutable'
+        return 'public, max-age=3600'
+
+    def select_encoding(self, environ, full_path):
+        accept = environ.get('HTTP_ACCEPT_ENCODING', '')
+        for encoding, suffix in self.encodings:
+            if encoding in accept and os.path.isfile(full_path + suffix):
+                return encoding, full_path + suffix
+        return None, full_path
+
+    def serve(self, environ, start_response, full_path, cache_control):
+        content_type, _ = mimetypes.guess_type(full_path)
+        encoding, file_path = self.select_encoding(environ, full_path)
+        stat = os.stat(file_path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+        headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Cache-Control', cache_control),
+            ('ETag', etag),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+            ('Accept-Ranges', 'bytes'),
+        ]
+        if full_path.endswith(COMPRESSIBLE):
+            headers.append(('Vary', 'Accept-Encoding'))
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+
+        if self.not_modified(environ, etag, stat.st_mtime):
+            start_response('304 Not Modified', headers)
+            return []
+
+        start, end = 0, stat.st_size - 1
+        status = '200 OK'
+        byte_range = self.parse_range(environ.get('HTTP_RANGE'), stat.st_size)
+        if byte_range == 'invalid':
+            start_response('416 Range Not Satisfiable', headers + [('Content-Range', f'bytes */{stat.st_size}')])
+            return []
+        if byte_range and environ.get('HTTP_IF_RANGE', etag) == etag:
+            start, end = byte_range
+            status = '206 Partial Content'
+            headers.append(('Content-Range', f'bytes {start}-{end}/{stat.st_size}'))
+        length = end - start + 1
+        headers.append(('Content-Length', str(length)))
+        start_response(status, headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        f = open(file_path, 'rb')
+        if status == '200 OK':
+            file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+            return file_wrapper(f, CHUNK_SIZE)
+        f.seek(start)
+        return self.read_range(f, length)
+
+    @staticmethod
+    def not_modified(environ, etag, mtime):
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            return if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]
+        if_modified_since = environ.get('HTTP_IF_MODIFIED_SINCE')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def parse_range(header, size):
+        # 단일 범위만 지원 : bytes=start-end, bytes=start-, bytes=-suffix
+        if not header or not header.startswith('bytes=') or ',' in header:
+            return None
+        start, _, end = header[len('bytes='):].strip().partition('-')
+        try:
+            if start:
+                start = int(start)
+                end = min(int(end), size - 1) if end else size - 1
+            else:
+                start, end = max(size - int(end), 0), size - 1
+        except ValueError:
+            return None
+        if start > end or start >= size:
+            return 'invalid'
+        return start, end
+
+    @staticmethod
+    def read_range(f, length):
+        try:
+            while length > 0:
+                chunk = f.read(min(CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
@@ -0,0 +1,259 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.signals import request_started
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+
+from accounts.models import User
+from articles.models import Article
+
+from . import cached_sessions, profiling, replicas, sessions
+from .static import CompressedManifestStaticFilesStorage, StaticFilesMiddleware
+
+
+class StaticFilesMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.body = b'body { color: red; }\n' * 50
+        self.path = os.path.join(self.root, 'site.0123456789ab.css')
+        with open(self.path, 'wb') as f:
+            f.write(self.body)
+        CompressedManifestStaticFilesStorage.compress(self.path)
+        settings = override_settings(STATIC_URL='/static/', STATIC_ROOT=self.root, MEDIA_ROOT=self.root + '-media')
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.middleware = StaticFilesMiddleware(self.application)
+
+    @staticmethod
+    def application(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'django']
+
+    def request(self, path, method='GET', **headers):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method, **headers}
+        setup_testing_defaults(environ)
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        body = b''.join(self.middleware(environ, start_response))
+        return response['status'], response['headers'], body
+
+    def test_hashed_file_is_immutable(self):
+        status, headers, body = self.request('/static/site.0123456789ab.css')
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(body, self.body)
+        self.assertIn('immutable', headers['Cache-Control'])
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+
+    def test_precompressed_file(self):
+        status, headers, body = self.request('/static/site.0123456789ab.css', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertLess(len(body), len(self.body))
+
+    def test_not_modified(self):
+        _, headers, _ = self.request('/static/site.0123456789ab.css')
+        status, _, body = self.request('/static/site.0123456789ab.css', HTTP_IF_NONE_MATCH=headers['ETag'])
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, b'')
+
+    def test_range(self):
+        status, headers, body = self.request('/static/site.0123456789ab.css', HTTP_RANGE='bytes=0-3')
+        self.assertEqual(status, '206 Partial Content')
+        self.assertEqual(body, self.body[:4])
+        status, _, _ = self.request('/static/site.0123456789ab.css', HTTP_RANGE=f'bytes={len(self.body)}-')
+        self.assertEqual(status, '416 Range Not Satisfiable')
+
+    def test_non_ascii_media_name(self):
+        os.makedirs(self.root + '-media')
+        self.addCleanup(shutil.rmtree, self.root + '-media', ignore_errors=True)
+        with open(os.path.join(self.root + '-media', '1920x1080_3_수정.jpg'), 'wb') as f:
+            f.write(b'jpeg')
+        # WSGI 서버가 넘기는 형태 (UTF-8 byte를 latin-1로 decode한 문자열)
+        path = '/media/1920x1080_3_수정.jpg'.encode('utf-8').decode('latin-1')
+        status, headers, body = self.request(path)
+        self.assertEqual((status, body), ('200 OK', b'jpeg'))
+        self.assertEqual(headers['Content-Type'], 'image/jpeg')
+
+    def test_other_requests_reach_django(self):
+        for path, method in (('/static/../etc/passwd', 'GET'), ('/static/missing.css', 'GET'),
+                             ('/static/site.0123456789ab.css', 'POST'), ('/articles/', 'GET')):
+            self.assertEqual(self.request(path, method)[2], b'django')
+
+
+@override_settings(PROFILING_SAMPLE_RATE=1)
+class ProfilingTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(profiling._samples, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def profile(self, view):
+        request = RequestFactory().get('/')
+        request.resolver_match = mock.Mock(view_name='test:view')
+        response = profiling.ProfilingMiddleware(view)(request)
+        return response, profiling._samples['test:view'][-1]
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('articles:index'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=')
+        self.assertIn('articles:index', profiling.summarize())
+
+    def test_repeated_query_is_reported(self):
+        def view(request):
+            # IN (...) 길이가 달라도 같은 쿼리
+            for ids in ([1], [1, 2], [1, 2, 3]):
+                list(User.objects.filter(pk__in=ids))
+            return HttpResponse('ok')
+
+        _, sample = self.profile(view)
+        self.assertEqual((sample['queries'], sample['size']), (3, 2))
+        report = profiling.summarize()['test:view']
+        self.assertEqual(report['samples'], 1)
+        self.assertEqual(len(report['duplicate_queries']), 1)
+        self.assertEqual(report['duplicate_queries'][0]['count'], 3)
+        self.assertIn('IN (...)', report['duplicate_queries'][0]['sql'])
+
+    def test_template_time(self):
+        engine = engines.all()[0]
+        _, sample = self.profile(lambda request: HttpResponse(engine.from_string('{{ value }}').render({'value': 1})))
+        self.assertGreater(sample['template_time'], 0)
+        _, sample = self.profile(lambda request: HttpResponse('ok'))
+        self.assertEqual(sample['template_time'], 0)
+
+    def test_report_is_staff_only(self):
+        self.client.force_login(User.objects.create_user('user', password='pw'))
+        response = self.client.get(reverse('profiling_report'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/admin/login/', response['Location'])
+        self.client.force_login(User.objects.create_user('staff', password='pw', is_staff=True))
+        self.assertIn('views', self.client.get(reverse('profiling_report')).json())
+
+
+class SqlitePragmaTest(TestCase):
+    def test_connection_is_tuned(self):
+        # AppConfig.ready()에서 등록한 connection_created receiver
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+
+class ConnectionHealthCheckTest(SimpleTestCase):
+    def check(self, conn_max_age, usable):
+        conn = mock.Mock(settings_dict={'CONN_MAX_AGE': conn_max_age})
+        conn.is_usable.return_value = usable
+        with mock.patch('crud.signals.connections') as conns:
+            conns.all.return_value = [conn]
+            request_started.send(sender=self.__class__)
+        return conn
+
+    def test_broken_persistent_connection_is_closed(self):
+        self.check(60, usable=False).close.assert_called_once_with()
+        self.check(60, usable=True).close.assert_not_called()
+
+    def test_per_request_connection_is_not_checked(self):
+        self.check(0, usable=False).is_usable.assert_not_called()
+
+
+@mock.patch('crud.replicas.replica_aliases', lambda: ['replica1'])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = replicas.ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def read(self, model, pinned=False):
+        with mock.patch.object(replicas._state, 'pinned', pinned, create=True):
+            return replicas.read_only(lambda request: self.router.db_for_read(model))(self.factory.get('/'))
+
+    def test_read_only_view_reads_replica(self):
+        self.assertEqual(self.read(Article), 'replica1')
+        self.assertEqual(self.router.db_for_read(Article), 'default')
+
+    def test_pinned_or_session_reads_default(self):
+        self.assertEqual(self.read(Article, pinned=True), 'default')
+        self.assertEqual(self.read(Session), 'default')
+
+    def test_request_user_is_loaded_before_replica(self):
+        routed = []
+        request = self.factory.get('/')
+        request.user = SimpleLazyObject(lambda: routed.append(self.router.db_for_read(User)) or User(pk=1))
+        replicas.read_only(lambda request: HttpResponse())(request)
+        self.assertEqual(routed, ['default'])
+
+    def pin_cookie(self, model):
+        def view(request):
+            self.router.db_for_write(model)
+            return HttpResponse()
+
+        response = replicas.ReplicaPinMiddleware(view)(self.factory.post('/'))
+        return response.cookies.get(settings.REPLICA_PIN_COOKIE)
+
+    def test_app_write_pins_to_default(self):
+        self.assertIsNotNone(self.pin_cookie(Article))
+        self.assertIsNotNone(self.pin_cookie(User))
+
+    def test_session_write_does_not_pin(self):
+        self.assertIsNone(self.pin_cookie(Session))
+
+
+class SessionStoreTest(TestCase):
+    SessionStore = sessions.SessionStore
+
+    def setUp(self):
+        session = self.SessionStore()
+        session['cart'] = [1, 2]
+        session.create()
+        self.session_key = session.session_key
+
+    def load(self):
+        session = self.SessionStore(self.session_key)
+        session['cart']
+        return session
+
+    def stored(self, session_key=None):
+        return Session.objects.get(session_key=session_key or self.session_key).get_decoded()
+
+    def test_unchanged_save_is_skipped(self):
+        session = self.load()
+        session['cart'] = [1, 2]
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_modified_save_writes(self):
+        session = self.load()
+        session['cart'].append(3)
+        session.save()
+        self.assertEqual(self.stored()['cart'], [1, 2, 3])
+
+    def test_must_create_writes(self):
+        # 로그인 때 cycle_key : 내용은 같아도 새 key로 저장해야 한다.
+        session = self.load()
+        session.cycle_key()
+        self.assertNotEqual(session.session_key, self.session_key)
+        self.assertEqual(self.stored(session.session_key)['cart'], [1, 2])
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True)
+    def test_save_every_request_writes(self):
+        # 만료 시간을 늘리기 위해 내용이 같아도 저장한다.
+        session = self.load()
+        with CaptureQueriesContext(connection) as captured:
+            session.save()
+        self.assertTrue(any(query['sql'].startswith('UPDATE "django_session"') for query in captured))
+
+
+class CachedSessionStoreTest(SessionStoreTest):
+    SessionStore = cached_sessions.SessionStore
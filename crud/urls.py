@@ -19,12 +19,15 @@ from django.conf import settings
 from django.conf.urls.static import static
 
 from articles import views
+from . import profiling
 urlpatterns = [
+    path('admin/profiling/', profiling.report, name='profiling_report'),
     path('admin/', admin.site.urls),
     path('articles/', include('articles.urls')),
     path('accounts/', include('accounts.urls')),
     path('accounts/', include('allauth.urls')),  # 반드시 기존 accounts app 밑에
     path('hashtags/<int:tag_pk>/', views.hashtag, name='hashtag'),
+    path('api/', include('articles.api_urls')),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crud.settings')
 
 application = get_wsgi_application()
+
+# 배포 모드 : static/media 파일은 Django view를 거치지 않고 바로 응답 (crud/static.py)
+if settings.SERVE_STATIC:
+    from .static import StaticFilesMiddleware
+    application = StaticFilesMiddleware(application)